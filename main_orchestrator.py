@@ -2,17 +2,24 @@
 from parser.testcase_loader import TestCaseLoader
 from runner.orchestrator import TestOrchestrator
 from runner.testcase_executor import TestCaseExecutor
+from runner.result_cache import ResultCache
+from runner.sharded import ShardedRunner, WorkerOptions
+from runner.checkpoint import RunCheckpoint
+from runner.deadline import Deadline
 from parser.test import TestStatus
 
 
 
-loader = TestCaseLoader(testcase_dir="./testcase")
-executor = TestCaseExecutor()
-
-orchestrator = TestOrchestrator(loader, executor)
-
 import asyncio
 import argparse
+import fnmatch
+import time
+from datetime import datetime
+
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+RESET = "\033[0m"
 
 def _parse_args():
     parser = argparse.ArgumentParser(description="Run a DSL testcase")
@@ -21,30 +28,209 @@ def _parse_args():
         help="Testcase name (without .txt)",
         default="backup_vm_incremental",
     )
+    parser.add_argument(
+        "--suite", "-s",
+        nargs="+",
+        metavar="SELECTOR",
+        help="Run many testcases in one process: names, globs (e.g. 'backup_*') or tag:<tag>",
+    )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=1,
+        help="Independent testcases to run concurrently",
+    )
+    parser.add_argument(
+        "--processes", "-p",
+        type=int,
+        default=1,
+        help="Suite mode: spread independent dependency chains over N worker processes",
+    )
+    parser.add_argument(
+        "--browser-recycle-after",
+        type=int,
+        default=20,
+        help="Relaunch the pooled browser after N testcases",
+    )
+    parser.add_argument(
+        "--lookahead",
+        type=int,
+        default=0,
+        help="Speculatively observe the next N UI steps (0 = off)",
+    )
+    parser.add_argument(
+        "--no-batch-observe",
+        action="store_true",
+        help="Observe each UI step separately instead of batching same-screen steps",
+    )
+    parser.add_argument(
+        "--no-pipeline",
+        action="store_true",
+        help="Start the browser only after PRE steps finish",
+    )
+    parser.add_argument(
+        "--llm-cache",
+        action="store_true",
+        help="Reuse cached planner responses for unchanged PRE/FINALLY text (storage/llm_cache.db)",
+    )
+    parser.add_argument(
+        "--no-compiled-plans",
+        action="store_true",
+        help="Always plan PRE/FINALLY with the LLM instead of reusing testcase/<name>.plans.json",
+    )
+    parser.add_argument(
+        "--budget-minutes",
+        type=float,
+        help="Time budget for the whole run; each testcase also gets @max_wait + overhead",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Continue a previous run: skip PASSED testcases and already-passed [skippable] steps",
+    )
+    parser.add_argument(
+        "--cache-ttl-hours",
+        type=float,
+        default=24,
+        help="Reuse PASSED dependency results recorded within this many hours",
+    )
+    parser.add_argument(
+        "--no-result-cache",
+        action="store_true",
+        help="Always re-run dependencies instead of reusing cached results",
+    )
+    parser.add_argument(
+        "--invalidate-cache",
+        nargs="*",
+        metavar="TESTCASE",
+        help="Drop cached results (all when no names are given) and exit",
+    )
     return parser.parse_args()
 
+def _select_testcases(loader, selectors):
+    """Resolve suite selectors (names, globs, tag:<tag>) to testcase names."""
+    names = loader.list_names()
+    selected = []
+    for selector in selectors:
+        if selector.startswith("tag:"):
+            matches = loader.with_tag(selector[len("tag:"):])
+        elif any(ch in selector for ch in "*?["):
+            matches = fnmatch.filter(names, selector)
+        else:
+            matches = [loader.canonical_name(selector)] if loader.exists(selector) else []
+        if not matches:
+            print(f"{YELLOW}No testcase matches '{selector}'{RESET}")
+        selected += [m for m in matches if m not in selected]
+    return selected
+
+def _colored(status):
+    color = GREEN if status == TestStatus.PASSED else YELLOW if status == TestStatus.SKIPPED else RED
+    return f"{color}{status.value.upper()}{RESET}"
+
+def _print_suite_summary(orchestrator, targets, wall_time):
+    print("\n================ SUITE RESULT ================")
+    print(f"{'Testcase':<40} {'Status':<8} Duration")
+    for name, status in orchestrator.results.items():
+        if name in orchestrator.reused:
+            duration = "reused"
+        elif name in orchestrator.durations:
+            duration = f"{orchestrator.durations[name]:.1f}s"
+        else:
+            duration = "-"
+        marker = "" if name in targets else "  (dependency)"
+        # pad before colouring so the columns line up
+        print(f"{name:<40} {_colored(status)}{' ' * (9 - len(status.value))}{duration}{marker}")
+    counts = {s: sum(1 for v in orchestrator.results.values() if v == s) for s in TestStatus}
+    print(
+        f"Passed: {counts[TestStatus.PASSED]}  Failed: {counts[TestStatus.FAILED]}  "
+        f"Skipped: {counts[TestStatus.SKIPPED]}  Reused: {len(orchestrator.reused)}"
+    )
+    print(f"Wall time: {wall_time:.1f}s")
+    print("==============================================\n")
+
 async def main():
     args = _parse_args()
     testcase = args.testcase
-    
-    GREEN = "\033[92m"
-    RED = "\033[91m"
-    YELLOW = "\033[93m"
-    RESET = "\033[0m"
-    status = await orchestrator.run_testcase(testcase)
+
+    loader = TestCaseLoader(testcase_dir="./testcase")
+
+    if args.invalidate_cache is not None:
+        # Results are keyed by declared @testcase name; accept file-name aliases too
+        names = [loader.canonical_name(name) for name in args.invalidate_cache]
+        count = ResultCache().invalidate(names)
+        print(f"Invalidated {count} cached result(s)")
+        return
+
+    result_cache = None if args.no_result_cache else ResultCache(ttl_hours=args.cache_ttl_hours)
+
+    checkpoint = RunCheckpoint.resume(args.resume) if args.resume else RunCheckpoint()
+    print(f"Run id: {checkpoint.run_id} (continue it with --resume {checkpoint.run_id})")
+
+    deadline = Deadline.after(args.budget_minutes * 60, "suite budget") if args.budget_minutes else None
+
+    executor = TestCaseExecutor(
+        browser_pool_size=args.workers,
+        recycle_after=args.browser_recycle_after,
+        lookahead=args.lookahead,
+        batch_observe=not args.no_batch_observe,
+        llm_cache=args.llm_cache,
+        compiled_plans=not args.no_compiled_plans,
+    )
+    orchestrator = TestOrchestrator(
+        loader,
+        executor,
+        # a suite keeps going past failures; dependents are still skipped
+        fail_fast=not args.suite,
+        max_workers=args.workers,
+        result_cache=result_cache,
+        pipeline=not args.no_pipeline,
+        checkpoint=checkpoint,
+        deadline=deadline,
+    )
+
+    if args.suite:
+        targets = _select_testcases(loader, args.suite)
+        if args.processes > 1:
+            # the summary only needs results / durations / reused, which both provide
+            orchestrator = ShardedRunner(loader, args.processes, WorkerOptions(
+                workers=args.workers,
+                recycle_after=args.browser_recycle_after,
+                lookahead=args.lookahead,
+                batch_observe=not args.no_batch_observe,
+                pipeline=not args.no_pipeline,
+                llm_cache=args.llm_cache,
+                compiled_plans=not args.no_compiled_plans,
+                cache_ttl_hours=None if args.no_result_cache else args.cache_ttl_hours,
+                run_id=checkpoint.run_id,
+                deadline=deadline,
+            ))
+        started = time.perf_counter()
+        try:
+            statuses = await orchestrator.run_testcases(targets)
+        finally:
+            await executor.close()
+        _print_suite_summary(orchestrator, targets, time.perf_counter() - started)
+        if not targets or any(s != TestStatus.PASSED for s in statuses.values()):
+            raise SystemExit(1)
+        return
+
+    try:
+        status = await orchestrator.run_testcase(testcase)
+    finally:
+        await executor.close()
 
     print("\n================ TEST RESULT ================")
     print(f"Testcase : {testcase}")
 
-    if status == TestStatus.PASSED:
-        print(f"Status   : {GREEN}{status.value.upper()}{RESET}")
-    elif status == TestStatus.SKIPPED:
-        print(f"Status   : {YELLOW}{status.value.upper()}{RESET}")
-    else:
-        print(f"Status   : {RED}{status.value.upper()}{RESET}")
+    print(f"Status   : {_colored(status)}")
+    for name, entry in orchestrator.reused.items():
+        recorded = datetime.fromtimestamp(entry["recorded_at"]).strftime("%Y-%m-%d %H:%M")
+        print(f"Reused   : {name} (cached PASSED from {recorded})")
     print("============================================\n")
 
     if status != TestStatus.PASSED:
         raise SystemExit(1)
 
-asyncio.run(main())
+# Guarded: --processes workers are spawned and re-import this module
+if __name__ == "__main__":
+    asyncio.run(main())
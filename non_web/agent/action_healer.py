@@ -1,6 +1,8 @@
 import json
 import re
 
+from non_web.agent.llm_cache import CACHE_NEVER
+
 class ActionHealer:
     """
     AI-powered self-healing for failed actions.
@@ -10,7 +12,7 @@ class ActionHealer:
         self.llm = llm
         self.max_heal_attempts = max_heal_attempts
     
-    def heal_action(self, 
+    async def heal_action(self, 
                     failed_action: dict, 
                     error_info: dict, 
                     goal: str, 
@@ -104,7 +106,8 @@ OR if the action cannot be fixed:
 }}
 """
         
-        result = self.llm.ask(prompt)
+        # Depends on live error output → never served from the cache
+        result = await self.llm.ask(prompt, cache_policy=CACHE_NEVER)
         print(f"\n[HEAL] AI Healer analyzing failure (attempt {attempt_number})...")
         print(f"[HEAL] Raw response:\n{result}\n")
         
@@ -2,37 +2,10 @@ import json
 import re
 from datetime import datetime
 
-class ActionPlanner:
-    """
-    Converts high-level plan steps into concrete action commands
-    """
-    def __init__(self, llm: "LLMClient"):
-        self.llm = llm
-
-    def create_action_list(self, goal: str, steps: list) -> list:
-        """
-        Convert plan steps into a list of concrete actions
-        
-        Returns list of action commands like:
-        - ssh_connect("10.10.26.255", "root", "P@ssword123")
-        - ssh_run("test -f /opt/data/report.txt && echo EXISTS || echo NOT_FOUND")
-        - ssh_disconnect()
-        - done
-        """
-        steps_text = "\n".join([f"{i+1}. {step}" for i, step in enumerate(steps)])
-        
-       
-        prompt = f"""
-You are an automation action planner.
-
-GOAL:
-{goal}
-
-STEPS:
-{steps_text}
-
-Convert these high-level steps into a concrete list of ACTION COMMANDS.
+from non_web.agent.llm_cache import CACHE_ALWAYS
 
+# Action vocabulary and safety rules, shared with the fused planner
+ACTION_RULES = """
 Available actions:
 - ssh_connect(host, username, password) 
   Connect to SSH server (Linux)
@@ -135,16 +108,9 @@ ABSOLUTE RULE:
 - NEVER use escaped quotes (\"), under any circumstances.
 - All shell strings MUST use single quotes only.
 ────────────────────────────────────
+""".strip("\n")
 
-Return ONLY a valid JSON array (no markdown, no explanation):
-
-[
-  "action_command_1",
-  "action_command_2",
-  ...
-  "done"
-]
-
+ACTION_EXAMPLES = """\
 ────────────────────────────────────
 Example for Linux / SSH:
 
@@ -180,8 +146,52 @@ Example for VMware vCenter (PowerCLI):
 ]
 """
 
+class ActionPlanner:
+    """
+    Converts high-level plan steps into concrete action commands
+    """
+    def __init__(self, llm: "LLMClient"):
+        self.llm = llm
+
+    async def create_action_list(self, goal: str, steps: list) -> list:
+        """
+        Convert plan steps into a list of concrete actions
+        
+        Returns list of action commands like:
+        - ssh_connect("10.10.26.255", "root", "P@ssword123")
+        - ssh_run("test -f /opt/data/report.txt && echo EXISTS || echo NOT_FOUND")
+        - ssh_disconnect()
+        - done
+        """
+        steps_text = "\n".join([f"{i+1}. {step}" for i, step in enumerate(steps)])
+        
+       
+        prompt = f"""
+You are an automation action planner.
+
+GOAL:
+{goal}
+
+STEPS:
+{steps_text}
+
+Convert these high-level steps into a concrete list of ACTION COMMANDS.
+
+{ACTION_RULES}
+
+Return ONLY a valid JSON array (no markdown, no explanation):
+
+[
+  "action_command_1",
+  "action_command_2",
+  ...
+  "done"
+]
+
+{ACTION_EXAMPLES}"""
+
         
-        result = self.llm.ask(prompt)
+        result = await self.llm.ask(prompt, cache_policy=CACHE_ALWAYS)
         print(f"[DEBUG] [{datetime.now().strftime('%H:%M:%S')}] ActionPlanner raw response:\n{result}\n")
         
         # Extract JSON from markdown code blocks if present
@@ -202,4 +212,5 @@ Example for VMware vCenter (PowerCLI):
         except json.JSONDecodeError as e:
             print(f"[ERROR] [{datetime.now().strftime('%H:%M:%S')}] Failed to parse action list JSON: {e}")
             print(f"[ERROR] Raw response was: {result}")
+            self.llm.forget(prompt)
             raise
@@ -1,18 +1,18 @@
 import json
-import google.generativeai as genai
 import os
 from dotenv import load_dotenv
 
+from non_web.agent.llm_client import LLMClient
+
 load_dotenv()
 
 class AIDomLocatorAgent:
 
-    def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel("models/gemini-2.5-flash")
+    def __init__(self, llm: LLMClient = None):
+        # Share the runner's LLM client (and so its gateway limits) when given one
+        self.llm = llm or LLMClient(os.getenv("GEMINI_API_KEY"))
 
-    def generate_locator(self, html_snapshot: str, target_description: str):
+    async def generate_locator(self, html_snapshot: str, target_description: str):
         """
         Input:
             html_snapshot → full DOM HTML
@@ -47,11 +47,8 @@ Return ONLY JSON in this format:
 """
 
         try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config={"temperature": 0}
-            )
-            result = response.text.strip()
+            response = await self.llm.ask(prompt, generation_config={"temperature": 0})
+            result = response.strip()
             
             # Extract JSON from markdown code blocks if present
             import re
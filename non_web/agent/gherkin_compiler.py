@@ -0,0 +1,167 @@
+# Rule-based compiler for Gherkin-style PRE/FINALLY steps (no LLM needed)
+import re
+from typing import List, Optional, Tuple
+
+# Gherkin keywords are noise for matching
+_KEYWORD_RE = re.compile(r'^(?:Given|When|Then|And|But|\*)\s+', re.IGNORECASE)
+_HEADER_RE = re.compile(r'^(?:Feature|Scenario(?: Outline)?|Background|Examples):', re.IGNORECASE)
+
+_SSH_CONNECT_RE = re.compile(
+    r'^I (?:connect|am connected) to (?:the )?Linux (?:machine|server|host) "(?P<host>[^"]+)" via SSH'
+    r'(?: as (?:user )?"(?P<user>[^"]+)" with password "(?P<password>[^"]+)")?\.?$',
+    re.IGNORECASE,
+)
+_SSH_AUTH_RE = re.compile(
+    r'^I authenticate as (?:user )?"(?P<user>[^"]+)" with password "(?P<password>[^"]+)"\.?$',
+    re.IGNORECASE,
+)
+_HYPERV_CONNECT_RE = re.compile(
+    r'^I am connected to the Hyper-V (?:server|host) at "(?P<host>[^"]+)" using administrator '
+    r'credentials with password "?(?P<password>[^"\s]+)"?\.?$',
+    re.IGNORECASE,
+)
+_CREATE_FILE_RE = re.compile(
+    r'^I create (?:a )?file "(?P<path>[^"]+)" with content "(?P<content>[^"]*)"\.?$',
+    re.IGNORECASE,
+)
+_FILE_EXISTS_RE = re.compile(r'^the file "(?P<path>[^"]+)" should exist\.?$', re.IGNORECASE)
+_FILE_CONTAINS_RE = re.compile(
+    r'^the file "(?P<path>[^"]+)" should contain "(?P<text>[^"]*)"\.?$',
+    re.IGNORECASE,
+)
+_SSH_COMMAND_RE = re.compile(r'^I run (?:the )?command "(?P<command>[^"]+)"\.?$', re.IGNORECASE)
+_PS_COMMAND_RE = re.compile(
+    r'^I (?:execute|run) the PowerShell command "(?P<command>[^"]+)"\.?$',
+    re.IGNORECASE,
+)
+_OUTPUT_CONTAINS_RE = re.compile(
+    r'^the (?:result|output) should contain (?:a [\w ]+? named )?"(?P<text>[^"]+)"\.?$',
+    re.IGNORECASE,
+)
+# Command failures already fail the action (non-zero exit) → nothing to emit
+_NO_ERROR_RE = re.compile(r'^no error(?: message)? should be (?:returned|shown)\.?$', re.IGNORECASE)
+
+
+def _quote(value: str) -> str:
+    """Single-quote for POSIX sh (the shell-safety rules forbid double quotes)."""
+    return "'" + value.replace("'", "'\\''") + "'"
+
+
+def _call(name: str, *args: str) -> str:
+    """Action command in the ActionPlanner format, e.g. ssh_run("ls")."""
+    return f"{name}(" + ", ".join(f'"{arg}"' for arg in args) + ")"
+
+
+def _step_text(step) -> str:
+    return getattr(step, "text", str(step)).strip()
+
+
+class _Context:
+    """Connections opened by compiled steps, so follow-up steps know their target."""
+    def __init__(self):
+        self.ssh = False
+        self.powershell = False
+
+
+def _compile_at(lines: List[str], i: int, ctx: _Context) -> Optional[Tuple[List[str], int]]:
+    """Compile the step at lines[i]; returns (actions, lines consumed) or None."""
+    line = _KEYWORD_RE.sub("", lines[i])
+
+    if _HEADER_RE.match(line) or _NO_ERROR_RE.match(line):
+        return [], 1
+
+    m = _SSH_CONNECT_RE.match(line)
+    if m:
+        user, password, consumed = m["user"], m["password"], 1
+        if not user and i + 1 < len(lines):
+            auth = _SSH_AUTH_RE.match(_KEYWORD_RE.sub("", lines[i + 1]))
+            if auth:
+                user, password, consumed = auth["user"], auth["password"], 2
+        if not user:
+            return None
+        ctx.ssh = True
+        return [_call("ssh_connect", m["host"], user, password)], consumed
+
+    m = _HYPERV_CONNECT_RE.match(line)
+    if m:
+        ctx.powershell = True
+        return [_call("powershell_connect", m["host"], "Administrator", m["password"])], 1
+
+    m = _PS_COMMAND_RE.match(line)
+    if m:
+        # Runs remotely when a powershell_connect is active, locally otherwise
+        return [_call("powershell_run", m["command"])], 1
+
+    m = _OUTPUT_CONTAINS_RE.match(line)
+    if m:
+        return [_call("verify_output", m["text"])], 1
+
+    # Everything below runs on the SSH machine
+    if not ctx.ssh:
+        return None
+
+    m = _CREATE_FILE_RE.match(line)
+    if m:
+        path = m["path"]
+        directory = path.rsplit("/", 1)[0] or "/"
+        command = f"mkdir -p {_quote(directory)} && printf '%s\\n' {_quote(m['content'])} > {_quote(path)}"
+        return [_call("ssh_run", command)], 1
+
+    m = _FILE_EXISTS_RE.match(line)
+    if m:
+        command = f"test -f {_quote(m['path'])} && echo EXISTS || echo NOT_FOUND"
+        return [_call("ssh_run", command), _call("verify_output", "EXISTS")], 1
+
+    m = _FILE_CONTAINS_RE.match(line)
+    if m:
+        return [_call("ssh_run", f"cat {_quote(m['path'])}"), _call("verify_output", m["text"])], 1
+
+    m = _SSH_COMMAND_RE.match(line)
+    if m:
+        return [_call("ssh_run", m["command"])], 1
+
+    return None
+
+
+def section_lines(section) -> List[str]:
+    """Non-empty step lines of a section (a list of Step objects or plain text)."""
+    if isinstance(section, str):
+        return [line.strip() for line in section.splitlines() if line.strip()]
+    return [_step_text(step) for step in section if _step_text(step)]
+
+
+def compile_section(section) -> List[Tuple[str, list]]:
+    """
+    Split a PRE/FINALLY section into segments:
+      ("actions", [action commands]) → recognized steps, same format as ActionPlanner
+      ("steps",   [step texts])      → unrecognized steps, still need the planner
+    Connections opened by compiled steps are closed at the end.
+    """
+    lines = section_lines(section)
+    ctx = _Context()
+    segments: List[Tuple[str, list]] = []
+    i = 0
+    while i < len(lines):
+        compiled = _compile_at(lines, i, ctx)
+        if compiled is None:
+            kind, items, consumed = "steps", [lines[i]], 1
+        else:
+            (items, consumed), kind = compiled, "actions"
+        if segments and segments[-1][0] == kind:
+            segments[-1][1].extend(items)
+        else:
+            segments.append((kind, list(items)))
+        i += consumed
+
+    closing = []
+    if ctx.ssh:
+        closing.append(_call("ssh_disconnect"))
+    if ctx.powershell:
+        closing.append(_call("powershell_disconnect"))
+    if closing:
+        if segments and segments[-1][0] == "actions":
+            segments[-1][1].extend(closing)
+        else:
+            segments.append(("actions", closing))
+
+    return [(kind, items) for kind, items in segments if items]
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+# Per-call-site policies for LLMClient.ask(cache_policy=...)
+CACHE_ALWAYS = "always"   # deterministic planning prompts: read and write the cache
+CACHE_NEVER = "never"     # failure recovery / runtime decisions: always ask the model
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of LLM responses backed by SQLite (WAL mode).
+
+    Keys are a SHA-256 of model, generation config and prompt, so any change
+    to one of them is a miss. Once the stored responses exceed max_bytes the
+    least recently used ones are evicted. Safe to share between the non-web
+    worker threads and across worker processes.
+    """
+    def __init__(self, path: str = "./storage/llm_cache.db", max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.stats = {"hit": 0, "miss": 0, "stored": 0, "evicted": 0}
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(model: str, config: dict, prompt: str) -> str:
+        payload = json.dumps({"model": model, "config": config, "prompt": prompt}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["miss"] += 1
+                return None
+            self.conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+        self.stats["hit"] += 1
+        return row[0]
+
+    def put(self, key: str, response: str):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO responses (key, response, size, last_used) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET response = excluded.response,"
+                " size = excluded.size, last_used = excluded.last_used",
+                (key, response, len(response.encode("utf-8")), time.time()),
+            )
+            self.stats["stored"] += 1
+            self._evict()
+
+    def delete(self, key: str):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall()
+        evict = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evict.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", evict)
+        self.stats["evicted"] += len(evict)
+
+    def close(self):
+        self.conn.close()
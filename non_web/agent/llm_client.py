@@ -1,19 +1,45 @@
-import google.generativeai as genai
+from non_web.agent.llm_cache import CACHE_ALWAYS, CACHE_NEVER, LLMResponseCache
+from non_web.agent.llm_gateway import DEFAULT_MODEL, LLMGateway, shared_gateway
+
+MODEL_NAME = DEFAULT_MODEL
+GENERATION_CONFIG = {"temperature": 0.2}
 
 class LLMClient:
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
+    def __init__(self, api_key: str, cache: LLMResponseCache = None, gateway: LLMGateway = None):
+        # All requests go through the process-wide async gateway: limits, retries, timeouts
         # Use gemini-2.5-flash for fast, capable AI reasoning
         # Other options: gemini-2.5-pro (more powerful), gemini-pro-latest (always latest)
-        self.model = genai.GenerativeModel("models/gemini-2.5-flash")
+        self.gateway = gateway or shared_gateway(api_key)
+        # Optional response cache, used only by call sites with cache_policy="always"
+        self.cache = cache
+
+    def _cache_key(self, prompt: str, generation_config: dict) -> str:
+        return LLMResponseCache.make_key(MODEL_NAME, generation_config, prompt)
+
+    async def ask(self, prompt: str, cache_policy: str = CACHE_NEVER, generation_config: dict = None):
+        generation_config = generation_config or GENERATION_CONFIG
+        use_cache = self.cache is not None and cache_policy == CACHE_ALWAYS
+        if use_cache:
+            cached = self.cache.get(self._cache_key(prompt, generation_config))
+            if cached is not None:
+                print("[LLM CACHE] hit")
+                return cached
 
-    def ask(self, prompt: str):
         try:
-            response = self.model.generate_content(
+            text = await self.gateway.generate(
                 prompt,
-                generation_config={"temperature": 0.2}
+                model=MODEL_NAME,
+                generation_config=generation_config,
             )
-            return response.text
         except Exception as e:
             print(f"[ERROR] LLM API call failed: {e}")
             raise
+
+        if use_cache:
+            self.cache.put(self._cache_key(prompt, generation_config), text)
+        return text
+
+    def forget(self, prompt: str, generation_config: dict = None):
+        """Drop a cached response the caller found unusable (e.g. invalid JSON)."""
+        if self.cache is not None:
+            self.cache.delete(self._cache_key(prompt, generation_config or GENERATION_CONFIG))
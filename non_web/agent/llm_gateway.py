@@ -0,0 +1,128 @@
+import asyncio
+import random
+import time
+from typing import Dict, Optional
+
+import google.generativeai as genai
+from google.api_core import exceptions as api_exceptions
+
+from runner.deadline import DeadlineExceeded, remaining_timeout
+
+DEFAULT_MODEL = "models/gemini-2.5-flash"
+
+# Quota / overload / transient server errors are worth retrying; bad requests are not
+RETRYABLE_ERRORS = (
+    api_exceptions.TooManyRequests,
+    api_exceptions.ResourceExhausted,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.InternalServerError,
+    api_exceptions.DeadlineExceeded,
+    asyncio.TimeoutError,
+    ConnectionError,
+)
+
+
+class TokenBucket:
+    """Allows `rate_per_minute` requests per minute with bursts up to `burst`."""
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class LLMGateway:
+    """
+    Single async entry point to the Gemini API, shared by every LLM user in
+    the process (planners, reasoner, healer, failure advisor, locator agent).
+
+    Requests are limited by a concurrency semaphore and a token bucket, get
+    a per-call timeout (capped by the current deadline) and are retried
+    with jittered exponential backoff on retryable errors.
+    """
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int = 4,
+        requests_per_minute: float = 60,
+        max_retries: int = 4,
+        base_delay_s: float = 1.0,
+        max_delay_s: float = 30.0,
+        timeout_s: float = 120.0,
+    ):
+        genai.configure(api_key=api_key)
+        self.max_retries = max_retries
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+        self.timeout_s = timeout_s
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._bucket = TokenBucket(requests_per_minute, burst=max_concurrency)
+        self._models: Dict[str, genai.GenerativeModel] = {}
+        self.stats = {"calls": 0, "retries": 0, "failed": 0}
+
+    def model(self, name: str = DEFAULT_MODEL) -> genai.GenerativeModel:
+        if name not in self._models:
+            self._models[name] = genai.GenerativeModel(name)
+        return self._models[name]
+
+    async def generate(
+        self,
+        prompt: str,
+        model: str = DEFAULT_MODEL,
+        generation_config: dict = None,
+        timeout_s: float = None,
+    ) -> str:
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire()
+            try:
+                async with self._semaphore:
+                    timeout = remaining_timeout(timeout_s or self.timeout_s, "LLM request")
+                    self.stats["calls"] += 1
+                    response = await asyncio.wait_for(
+                        self.model(model).generate_content_async(
+                            prompt,
+                            generation_config=generation_config,
+                            request_options={"timeout": timeout},
+                        ),
+                        timeout,
+                    )
+                    return response.text
+            except DeadlineExceeded:
+                raise
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    self.stats["failed"] += 1
+                    raise
+                delay = min(self.max_delay_s, self.base_delay_s * 2 ** attempt)
+                delay *= random.uniform(0.5, 1.5)
+                # never sleep past the deadline
+                delay = min(delay, remaining_timeout(delay, "LLM retry backoff"))
+                self.stats["retries"] += 1
+                print(f"[LLM] {type(e).__name__}: {e}; retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            except Exception:
+                self.stats["failed"] += 1
+                raise
+
+
+_shared: Optional[LLMGateway] = None
+
+
+def shared_gateway(api_key: str) -> LLMGateway:
+    """The process-wide gateway, created on first use; all LLM users share its limits."""
+    global _shared
+    if _shared is None:
+        _shared = LLMGateway(api_key)
+    return _shared
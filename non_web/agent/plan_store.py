@@ -0,0 +1,71 @@
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from non_web.agent.step_reasoner import StepReasoner
+from runner.json_file import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+# Bump when the action command format changes so old plans are ignored
+PLAN_FORMAT = 1
+
+
+class CompiledPlanStore:
+    """
+    Compiled action lists for a testcase's PRE/FINALLY sections, stored next
+    to the testcase as <name>.plans.json.
+
+    Entries are keyed by a hash of the section's step text, so editing a
+    section re-plans it. A cached list is only used if it still validates;
+    the orchestrator invalidates it when executing it fails.
+    """
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.entries = self._load()
+
+    @classmethod
+    def for_testcase(cls, testcase_path: str) -> "CompiledPlanStore":
+        base, _ = os.path.splitext(testcase_path)
+        return cls(f"{base}.plans.json")
+
+    @staticmethod
+    def section_key(section) -> str:
+        """Hash of the section text (a list of Step objects or plain text)."""
+        if isinstance(section, str):
+            text = section
+        else:
+            text = "\n".join(getattr(step, "text", str(step)) for step in section)
+        payload = f"{PLAN_FORMAT}\n{text}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _load(self) -> dict:
+        return read_json(self.path, "plan cache")
+
+    def _save(self):
+        write_json(self.path, self.entries)
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+        if not StepReasoner.validate_action_list(entry.get("actions")):
+            logger.warning(f"Cached plan {key[:12]} in {self.path.name} failed validation; re-planning")
+            self.invalidate(key)
+            return None
+        return entry
+
+    def put(self, key: str, goal: str, actions: List[str]):
+        self.entries[key] = {
+            "goal": goal,
+            "actions": actions,
+            "compiled_at": time.time(),
+        }
+        self._save()
+
+    def invalidate(self, key: str):
+        if self.entries.pop(key, None) is not None:
+            self._save()
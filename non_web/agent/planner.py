@@ -2,11 +2,15 @@ import json
 import re
 from datetime import datetime
 
+from non_web.agent.llm_cache import CACHE_ALWAYS
+from non_web.agent.action_planner import ACTION_EXAMPLES, ACTION_RULES
+from non_web.agent.step_reasoner import StepReasoner
+
 class Planner:
     def __init__(self, llm: "LLMClient"):
         self.llm = llm
 
-    def create_plan(self, testcase_text: str) -> dict:
+    async def create_plan(self, testcase_text: str) -> dict:
         prompt = f"""
 You are a senior automation planner.
 
@@ -27,7 +31,8 @@ Return ONLY valid JSON in this exact format:
   "steps": ["step1", "step2"]
 }}
 """
-        result = self.llm.ask(prompt)
+        # Same testcase text → same plan, so planning responses are cacheable
+        result = await self.llm.ask(prompt, cache_policy=CACHE_ALWAYS)
         print(f"[DEBUG] [{datetime.now().strftime('%H:%M:%S')}] Planner raw response:\n{result}\n")
         
         # Extract JSON from markdown code blocks if present
@@ -43,4 +48,77 @@ Return ONLY valid JSON in this exact format:
         except json.JSONDecodeError as e:
             print(f"[ERROR] Failed to parse JSON: {e}")
             print(f"[ERROR] Raw response was: {result}")
+            self.llm.forget(prompt)
             raise
+
+
+    async def create_full_plan(self, testcase_text: str):
+        """
+        Goal, steps and the concrete action list in ONE model call.
+        Returns None when the response does not validate, so the caller can
+        fall back to create_plan + ActionPlanner.create_action_list.
+        """
+        prompt = f"""
+You are a senior automation planner and action planner.
+
+CRITICAL RULES (must follow):
+- Preserve ALL literals EXACTLY as written in the testcase.
+- Do NOT redact, abstract, paraphrase, or hide credentials.
+- Strings inside quotes MUST appear unchanged in output.
+- Do NOT replace passwords with generic wording.
+
+Convert the following testcase into a PLANNED GOAL, REQUIRED STEPS and a
+concrete list of ACTION COMMANDS that performs those steps.
+
+Testcase:
+{testcase_text}
+
+{ACTION_RULES}
+
+Return ONLY a valid JSON object (no markdown, no explanation) in this exact format:
+{{
+  "goal": "string",
+  "steps": ["step1", "step2"],
+  "actions": ["action_command_1", "action_command_2", "done"]
+}}
+
+Example:
+{{
+  "goal": "Verify report.txt exists on 10.10.26.255",
+  "steps": ["Connect to 10.10.26.255 as root", "Check /opt/data/report.txt exists"],
+  "actions": [
+    "ssh_connect(\\"10.10.26.255\\", \\"root\\", \\"P@ssword123\\")",
+    "ssh_run(\\"test -f /opt/data/report.txt && echo EXISTS || echo NOT_FOUND\\")",
+    "verify_output(\\"EXISTS\\")",
+    "ssh_disconnect()",
+    "done"
+  ]
+}}
+
+Reference "actions" lists per platform:
+{ACTION_EXAMPLES}"""
+        result = await self.llm.ask(prompt, cache_policy=CACHE_ALWAYS)
+        print(f"[DEBUG] [{datetime.now().strftime('%H:%M:%S')}] Fused planner raw response:\n{result}\n")
+
+        json_match = re.search(r'```(?:json)?\s*(\{.*\})\s*```', result, re.DOTALL)
+        if json_match:
+            result = json_match.group(1)
+
+        try:
+            plan = json.loads(result.strip())
+        except json.JSONDecodeError as e:
+            print(f"[WARN] Fused plan is not valid JSON ({e}); falling back to two-stage planning")
+            self.llm.forget(prompt)
+            return None
+
+        if (
+            not isinstance(plan, dict)
+            or not isinstance(plan.get("goal"), str)
+            or not isinstance(plan.get("steps"), list)
+            or not StepReasoner.validate_action_list(plan.get("actions"))
+        ):
+            print("[WARN] Fused plan failed validation; falling back to two-stage planning")
+            self.llm.forget(prompt)
+            return None
+
+        return plan
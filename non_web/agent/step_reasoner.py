@@ -2,13 +2,39 @@ import json
 import re
 from datetime import datetime
 
+# Commands _parse_action_command maps to router actions
+ACTION_COMMANDS = {
+    "ssh_connect", "ssh_run", "ssh_disconnect", "local_run", "verify_output",
+    "powershell_connect", "powershell_run", "powershell_command",
+    "powershell_capability", "powershell_disconnect",
+}
+_ACTION_RE = re.compile(r'(\w+)\((.*)\)$')
+
 class StepReasoner:
     def __init__(self, llm: "LLMClient", action_list: list = None):
         self.llm = llm
         self.action_list = action_list or []
         self.current_action_index = 0
 
-    def next_action(self, goal: str, history: list, last_result: dict):
+    def load_action_list(self, action_list: list):
+        """Use a precompiled action list (e.g. from the plan cache)."""
+        self.action_list = list(action_list)
+        self.current_action_index = 0
+
+    @staticmethod
+    def validate_action_list(action_list) -> bool:
+        """Known commands only, ending with "done"."""
+        if not isinstance(action_list, list) or not action_list:
+            return False
+        if str(action_list[-1]).strip().lower() != "done":
+            return False
+        for action_cmd in action_list[:-1]:
+            match = _ACTION_RE.match(str(action_cmd).strip())
+            if not match or match.group(1) not in ACTION_COMMANDS:
+                return False
+        return True
+
+    async def next_action(self, goal: str, history: list, last_result: dict):
         # If we have a predefined action list, use it
         if self.action_list and self.current_action_index < len(self.action_list):
             action_cmd = self.action_list[self.current_action_index]
@@ -58,7 +84,7 @@ Rules:
   }}
 """
 
-        result = self.llm.ask(prompt)
+        result = await self.llm.ask(prompt)
         print(f"[DEBUG] StepReasoner raw response:\n{result}\n")
         
         # Extract JSON from markdown code blocks if present
@@ -1,31 +1,129 @@
+import asyncio
+import contextvars
+import functools
+
+from runner.deadline import current_deadline
+from non_web.agent.llm_cache import CACHE_NEVER
+from non_web.agent.gherkin_compiler import compile_section, section_lines
+
+
 class Orchestrator:
-    def __init__(self, planner, reasoner, executor, action_planner=None, action_healer=None, interactive_mode=False):
+    def __init__(self, planner, reasoner, executor, action_planner=None, action_healer=None, interactive_mode=False, blocking_pool=None, fused_planning=True, rule_compiler=True):
         self.planner = planner
         self.reasoner = reasoner
         self.executor = executor
         self.action_planner = action_planner
         self.action_healer = action_healer
         self.interactive_mode = interactive_mode  # Ask user on failures
+        # Thread pool for blocking SSH / subprocess calls and input() (None → loop default);
+        # LLM calls are native async through the LLM gateway
+        self.blocking_pool = blocking_pool
+        # Plan goal + actions in one model call (two-stage path is the fallback)
+        self.fused_planning = fused_planning
+        # Compile recognizable Gherkin steps with rules before asking the LLM
+        self.rule_compiler = rule_compiler
+
+    async def _blocking(self, fn, *args, **kwargs):
+        """Run a blocking call in the thread pool so the event loop keeps running."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        return await loop.run_in_executor(self.blocking_pool, call)
+
+    async def run(self, testcase_text: str, plans=None):
+        """
+        plans → CompiledPlanStore; an unchanged section reuses its compiled
+        action list and skips both planning calls.
+        """
+        key = plans.section_key(testcase_text) if plans else None
+        cached = plans.get(key) if plans else None
+
+        if cached:
+            print(f"📦 Using compiled action list ({len(cached['actions'])} actions, planning skipped)")
+            goal = cached["goal"]
+            self.reasoner.load_action_list(cached["actions"])
+        else:
+            compiled = await self._compile(testcase_text) if self.rule_compiler else None
+            if compiled:
+                goal, action_list = compiled
+            else:
+                goal, action_list = await self._plan(testcase_text)
+            if action_list:
+                self.reasoner.load_action_list(action_list)
+
+            if plans and action_list and self.reasoner.validate_action_list(action_list):
+                plans.put(key, goal, action_list)
+
+        passed = await self._run_actions(goal)
+        if not passed and key:
+            # Cached or freshly planned, a list that failed is planned again next time
+            plans.invalidate(key)
+        return passed
+
+    async def _plan(self, testcase_text):
+        """LLM planning → (goal, action list or None without an action planner)."""
+        if self.fused_planning and self.action_planner and hasattr(self.planner, "create_full_plan"):
+            full_plan = await self.planner.create_full_plan(testcase_text)
+            if full_plan:
+                return full_plan["goal"], full_plan["actions"]
 
-    def run(self, testcase_text: str):
         # 1) Build plan
-        plan = self.planner.create_plan(testcase_text)
-        
+        plan = await self.planner.create_plan(testcase_text)
         goal = plan["goal"]
-        steps = plan["steps"]
-        
+
         # 2) Generate action list if action_planner is available
+        action_list = None
         if self.action_planner:
-            action_list = self.action_planner.create_action_list(goal, testcase_text)
-            self.reasoner.action_list = action_list
-            self.reasoner.current_action_index = 0
-        
+            action_list = await self.action_planner.create_action_list(goal, testcase_text)
+        return goal, action_list
+
+    async def _compile(self, testcase_text):
+        """
+        Rule-based compilation of Gherkin-style steps → (goal, action list).
+        Only the steps no rule recognizes are sent to the planner; returns
+        None to plan the whole section instead when nothing was recognized
+        or unrecognized steps follow a compiled connect (planned on their
+        own, they would not know its host or could disconnect it).
+        """
+        segments = compile_section(testcase_text)
+        if not any(kind == "actions" for kind, _ in segments):
+            return None
+
+        action_list, planned, connected = [], 0, False
+        for kind, items in segments:
+            if kind == "actions":
+                action_list.extend(items)
+                connected = connected or any(
+                    a.startswith(("ssh_connect(", "powershell_connect(")) for a in items
+                )
+                continue
+            if connected or not self.action_planner:
+                return None
+            _, actions = await self._plan("\n".join(items))
+            if not actions:
+                return None
+            action_list.extend(a for a in actions if str(a).strip().lower() != "done")
+            planned += len(items)
+        action_list.append("done")
+
+        if planned:
+            print(f"⚡ Rule compiler: {len(action_list) - 1} actions, {planned} step(s) planned by the LLM")
+        else:
+            print(f"⚡ Rule compiler: {len(action_list) - 1} actions, LLM planning skipped")
+        goal = "Execute steps: " + " / ".join(section_lines(testcase_text))
+        return goal, action_list
+
+    async def _run_actions(self, goal: str) -> bool:
         history = []
         last_result = {"info": "start"}
 
+        deadline = current_deadline()
         while True:
+            # Stop the agent loop once the testcase budget is spent
+            if deadline:
+                deadline.check(f"non-web action {len(history) + 1} ({goal})")
+
             # 2) AI decides next action
-            decision = self.reasoner.next_action(goal, history, last_result)
+            decision = await self.reasoner.next_action(goal, history, last_result)
 
             if decision.get("status") == "goal_achieved":
                 print("🎉 GOAL ACHIEVED!")
@@ -36,7 +134,7 @@ class Orchestrator:
             print(f"\n▶ Executing action: {action}")
 
             # 3) Execute with self-healing loop
-            result = self._execute_with_healing(action, goal, history)
+            result = await self._execute_with_healing(action, goal, history)
             
             # Print result details
             if result.get("success"):
@@ -59,7 +157,7 @@ class Orchestrator:
 
             # Handle failures based on action type and mode
             if not result.get("success"):
-                should_continue = self._handle_failure(action, result, history)
+                should_continue = await self._handle_failure(action, result, history)
                 if not should_continue:
                     return False
             
@@ -69,7 +167,7 @@ class Orchestrator:
                 print(f"   {result.get('error', 'Unknown error')}")
                 return False
     
-    def _execute_with_healing(self, action: dict, goal: str, history: list) -> dict:
+    async def _execute_with_healing(self, action: dict, goal: str, history: list) -> dict:
         """
         Execute an action with self-healing capability.
         If it fails, try to heal and retry.
@@ -78,7 +176,7 @@ class Orchestrator:
         as they are checking expected conditions, not performing actions.
         """
         # First attempt
-        result = self.executor.execute(action)
+        result = await self._blocking(self.executor.execute, action)
         
         # If successful or no healer available, return immediately
         if result.get("success") or not self.action_healer:
@@ -99,7 +197,7 @@ class Orchestrator:
             print(f"\n🔧 SELF-HEALING: Action failed, attempting to heal (attempt {attempt}/{max_attempts})...")
             
             # Ask the healer to analyze and fix
-            healing_decision = self.action_healer.heal_action(
+            healing_decision = await self.action_healer.heal_action(
                 failed_action=action,
                 error_info=result,
                 goal=goal,
@@ -120,7 +218,7 @@ class Orchestrator:
             
             # Try the corrected action
             print(f"🔧 HEALING: Trying corrected action: {corrected_action}")
-            result = self.executor.execute(corrected_action)
+            result = await self._blocking(self.executor.execute, corrected_action)
             
             # If it succeeded, we're done!
             if result.get("success"):
@@ -134,7 +232,7 @@ class Orchestrator:
         print(f"❌ HEALING EXHAUSTED: Could not fix action after {max_attempts} attempts")
         return result  # Return the last failure
     
-    def _handle_failure(self, action: dict, result: dict, history: list) -> bool:
+    async def _handle_failure(self, action: dict, result: dict, history: list) -> bool:
         """
         Handle action failures - use AI to decide whether to continue or stop.
 
@@ -158,7 +256,7 @@ class Orchestrator:
             print(f"   2. Stop the test")
 
             try:
-                choice = input("Enter choice (1 or 2): ").strip()
+                choice = (await self._blocking(input, "Enter choice (1 or 2): ")).strip()
                 if choice == "1":
                     print("⏭️  Continuing with next action...")
                     return True
@@ -170,9 +268,9 @@ class Orchestrator:
                 return False
         else:
             # Use AI to decide whether to continue or stop
-            return self._ai_decide_on_failure(action, result, history)
+            return await self._ai_decide_on_failure(action, result, history)
     
-    def _ai_decide_on_failure(self, action: dict, result: dict, history: list) -> bool:
+    async def _ai_decide_on_failure(self, action: dict, result: dict, history: list) -> bool:
         """
         Use AI to intelligently decide whether to continue or stop after a failure.
         
@@ -237,7 +335,7 @@ Return ONLY valid JSON (no markdown):
         
         try:
             import re
-            response = self.planner.llm.ask(prompt)
+            response = await self.planner.llm.ask(prompt, cache_policy=CACHE_NEVER)
             print(f"[AI DECISION] Raw response:\n{response}\n")
             
             # Extract JSON
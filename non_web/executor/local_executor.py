@@ -1,13 +1,19 @@
 import subprocess
 
+from runner.deadline import remaining_timeout
+
 class LocalExecutor:
     def run(self, command):
         try:
-            p = subprocess.run(command, shell=True, capture_output=True, text=True)
+            # No fixed limit; bounded by the testcase deadline when there is one
+            timeout = remaining_timeout(None, f"local command: {command}")
+            p = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=timeout)
             return {
                 "success": p.returncode == 0,
                 "stdout": p.stdout,
                 "stderr": p.stderr,
             }
+        except subprocess.TimeoutExpired:
+            return {"success": False, "error": f"Local command timed out after {timeout:.0f}s"}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -1,6 +1,11 @@
 import subprocess
 import json
 
+from runner.deadline import remaining_timeout
+
+LOCAL_TIMEOUT_S = 30
+REMOTE_TIMEOUT_S = 60
+
 class PowerShellExecutor:
     """
     Executor for Windows PowerShell commands and remote PowerShell sessions (WinRM)
@@ -11,6 +16,8 @@ class PowerShellExecutor:
         self.password = password
         self.is_connected = False
         self.credential_created = False
+        # (host, user, password) that already passed Test-WSMan in this process
+        self._verified = set()
 
     def connect(self, remote_host=None, username=None, password=None):
         """
@@ -23,7 +30,17 @@ class PowerShellExecutor:
         
         if not all([self.remote_host, self.username, self.password]):
             return {"success": False, "error": "Missing PowerShell remote credentials"}
-        
+
+        key = (self.remote_host, self.username, self.password)
+        if key in self._verified:
+            self.is_connected = True
+            self.credential_created = True
+            return {
+                "success": True,
+                "stdout": f"PowerShell remoting available on {self.remote_host}",
+                "output": f"Connected to {self.remote_host} via WinRM (already verified)"
+            }
+
         try:
             # Test if we can reach the remote host
             test_cmd = f'Test-WSMan -ComputerName {self.remote_host} -ErrorAction Stop'
@@ -32,6 +49,7 @@ class PowerShellExecutor:
             if result.get("success"):
                 self.is_connected = True
                 self.credential_created = True
+                self._verified.add(key)
                 return {
                     "success": True,
                     "stdout": f"PowerShell remoting available on {self.remote_host}",
@@ -87,7 +105,7 @@ class PowerShellExecutor:
                 ps_command,
                 capture_output=True,
                 text=True,
-                timeout=30
+                timeout=remaining_timeout(LOCAL_TIMEOUT_S, f"PowerShell: {command}")
             )
             
             return {
@@ -120,7 +138,7 @@ Invoke-Command -ComputerName {self.remote_host} -Credential $Cred -ScriptBlock {
                 ['powershell.exe', '-NoProfile', '-NonInteractive', '-Command', ps_script],
                 capture_output=True,
                 text=True,
-                timeout=60
+                timeout=remaining_timeout(REMOTE_TIMEOUT_S, f"remote PowerShell: {command}")
             )
             
             return {
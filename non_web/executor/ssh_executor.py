@@ -1,12 +1,21 @@
 import paramiko
 
+from runner.deadline import remaining_timeout
+
+KEEPALIVE_INTERVAL_S = 30
+CONNECT_TIMEOUT_S = 10
+
+
 class SSHExecutor:
-    def __init__(self, host=None, user=None, password=None):
+    def __init__(self, host=None, user=None, password=None, keep_alive=False):
         self.host = host
         self.user = user
         self.password = password
         self.ssh_client = None
         self.is_connected = False
+        # keep_alive=True → disconnect() parks the connection so a later
+        # connect() to the same host/user reuses it; close() really closes it
+        self.keep_alive = keep_alive
 
     def connect(self, host=None, user=None, password=None):
         """Establish SSH connection"""
@@ -17,11 +26,23 @@ class SSHExecutor:
         
         if not all([host, user, password]):
             return {"success": False, "error": "Missing SSH credentials"}
-        
+
+        if self._can_reuse(host, user, password):
+            self.is_connected = True
+            return {
+                "success": True,
+                "stdout": f"Connected to {host} (reused)",
+                "output": f"Connected to {host} (reused)"
+            }
+        self.close()
+
         try:
             self.ssh_client = paramiko.SSHClient()
             self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            self.ssh_client.connect(host, username=user, password=password, timeout=10)
+            timeout = remaining_timeout(CONNECT_TIMEOUT_S, f"SSH connect to {host}")
+            self.ssh_client.connect(host, username=user, password=password, timeout=timeout)
+            if self.keep_alive:
+                self.ssh_client.get_transport().set_keepalive(KEEPALIVE_INTERVAL_S)
             
             self.host = host
             self.user = user
@@ -37,11 +58,31 @@ class SSHExecutor:
             self.is_connected = False
             return {"success": False, "error": f"SSH connection failed: {str(e)}"}
 
+    def _can_reuse(self, host, user, password) -> bool:
+        if not self.keep_alive or not self.ssh_client:
+            return False
+        if (host, user, password) != (self.host, self.user, self.password):
+            return False
+        transport = self.ssh_client.get_transport()
+        return transport is not None and transport.is_active()
+
     def disconnect(self):
-        """Close SSH connection"""
+        """Close SSH connection (parked instead when keep_alive is on)"""
+        if self.keep_alive and self.ssh_client:
+            self.is_connected = False
+            return {
+                "success": True,
+                "stdout": "Disconnected from SSH",
+                "output": "Disconnected from SSH"
+            }
+        return self.close()
+
+    def close(self):
+        """Really close the SSH connection, parked or not"""
         if self.ssh_client:
             try:
                 self.ssh_client.close()
+                self.ssh_client = None
                 self.is_connected = False
                 return {
                     "success": True,
@@ -64,8 +105,13 @@ class SSHExecutor:
                 return {"success": False, "error": "Not connected to SSH server"}
         
         try:
-            stdin, stdout, stderr = self.ssh_client.exec_command(command)
-            exit_status = stdout.channel.recv_exit_status()
+            timeout = remaining_timeout(None, f"SSH command: {command}")
+            stdin, stdout, stderr = self.ssh_client.exec_command(command, timeout=timeout)
+            channel = stdout.channel
+            if timeout is not None and not channel.status_event.wait(timeout):
+                channel.close()
+                return {"success": False, "error": f"SSH command timed out after {timeout:.0f}s"}
+            exit_status = channel.recv_exit_status()
             
             stdout_text = stdout.read().decode().strip()
             stderr_text = stderr.read().decode().strip()
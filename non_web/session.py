@@ -0,0 +1,85 @@
+from non_web.agent.llm_client import LLMClient
+from non_web.agent.llm_cache import LLMResponseCache
+from non_web.agent.llm_gateway import LLMGateway
+from non_web.agent.planner import Planner
+from non_web.agent.action_planner import ActionPlanner
+from non_web.agent.step_reasoner import StepReasoner
+from non_web.agent.action_healer import ActionHealer
+from non_web.executor.local_executor import LocalExecutor
+from non_web.executor.ssh_executor import SSHExecutor
+from non_web.executor.powershell_executor import PowerShellExecutor
+from non_web.executor.command_router import CommandRouter
+from non_web.coordinator.orchestrator import Orchestrator
+
+
+class NonWebSession:
+    """
+    Non-web agent stack (LLM client, planners, executors, router) built once
+    and reused for every PRE/FINALLY section of a run.
+
+    Only per-run state is reset between sections, so a session runs one
+    section at a time; concurrent testcases each need their own session.
+    SSH connections are kept alive after ssh_disconnect, so a FINALLY on the
+    same host as PRE reuses the connection instead of reconnecting.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        interactive_mode: bool = False,
+        blocking_pool=None,
+        llm_cache: LLMResponseCache = None,
+        fused_planning: bool = True,
+        llm_gateway: LLMGateway = None,
+        rule_compiler: bool = True,
+    ):
+        self.llm = LLMClient(api_key, cache=llm_cache, gateway=llm_gateway)
+
+        # AI Components
+        self.planner = Planner(self.llm)
+        self.action_planner = ActionPlanner(self.llm)
+        self.reasoner = StepReasoner(self.llm)
+        self.healer = ActionHealer(self.llm, max_heal_attempts=3)
+
+        # Executors
+        self.local = LocalExecutor()
+        # Credentials are provided later via ssh_connect / powershell_connect actions
+        self.ssh = SSHExecutor(keep_alive=True)
+        self.powershell = PowerShellExecutor()
+        self.router = CommandRouter(self.local, self.ssh, self.powershell)
+
+        # interactive_mode=False - Auto-stop on connection failures, continue on non-critical failures
+        # interactive_mode=True - Ask user what to do when any action fails
+        self.orchestrator = Orchestrator(
+            self.planner,
+            self.reasoner,
+            self.router,
+            self.action_planner,
+            self.healer,
+            interactive_mode=interactive_mode,
+            blocking_pool=blocking_pool,
+            fused_planning=fused_planning,
+            rule_compiler=rule_compiler,
+        )
+        self.runs = 0
+
+    def reset(self):
+        """Forget per-run state; live connections are parked, not closed."""
+        self.reasoner.action_list = []
+        self.reasoner.current_action_index = 0
+        self.router.last_output = None
+        if self.router.ssh_connected:
+            self.ssh.disconnect()
+        if self.router.powershell_connected:
+            self.powershell.disconnect()
+        self.router.ssh_connected = False
+        self.router.powershell_connected = False
+
+    async def run(self, testcase: str, plans=None) -> bool:
+        self.reset()
+        self.runs += 1
+        return await self.orchestrator.run(testcase, plans=plans)
+
+    def close(self):
+        self.reset()
+        self.ssh.close()
@@ -1,11 +1,13 @@
 # parser/dsl_models.py
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List
 
 @dataclass
 class Step:
     text: str
     is_physical: bool = False
+    # "[skippable]" prefix: safe to skip on --resume once it has passed
+    skippable: bool = False
 
 @dataclass
 class TestCase:
@@ -17,3 +19,4 @@ class TestCase:
     # New timing parameters (in minutes)
     max_wait: int = 120
     poll_interval: int = 2
+    tags: List[str] = field(default_factory=list)
@@ -1,32 +1,170 @@
 # parser/testcase_loader.py
+import logging
 import os
+from dataclasses import dataclass
+from typing import Dict, List, Set
 from parser.testcase_parser import parse_testcase
 from parser.dsl_models import TestCase
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CatalogEntry:
+    name: str          # declared @testcase name (file base name if missing)
+    path: str
+    mtime: float
+    size: int
+    testcase: TestCase
+
+
 class TestCaseLoader:
+    """
+    Catalog of the testcase directory.
+
+    Files are indexed by their declared @testcase name (the file base name
+    stays usable as an alias). Parsed TestCase objects are cached and only
+    re-parsed when a file's mtime/size changes (checked on every lookup).
+    The directory is re-scanned when its own mtime changes (files
+    added/removed) or on refresh().
+    """
 
     def __init__(self, testcase_dir: str):
         self.testcase_dir = testcase_dir
+        self._entries: Dict[str, CatalogEntry] = {}   # path → entry
+        self._index: Dict[str, str] = {}              # name / alias → path
+        self._dependents: Dict[str, Set[str]] = {}    # name → direct dependents
+        self._dir_mtime = None
+
+    # ─────────── scanning ───────────
+
+    def refresh(self):
+        """Stat every testcase file, re-parse changed ones and rebuild the indexes."""
+        self._dir_mtime = os.stat(self.testcase_dir).st_mtime
+        seen = set()
+        with os.scandir(self.testcase_dir) as it:
+            for dirent in it:
+                if dirent.is_file() and dirent.name.endswith(".txt"):
+                    seen.add(dirent.path)
+                    self._refresh_entry(dirent.path, dirent.stat())
+        for path in set(self._entries) - seen:
+            del self._entries[path]
+        self._rebuild_indexes()
+
+    def _ensure_scanned(self):
+        if self._dir_mtime != os.stat(self.testcase_dir).st_mtime:
+            self.refresh()
+            return
+        # Files edited in place keep the directory mtime → one stat per file
+        changed = False
+        try:
+            for path, entry in list(self._entries.items()):
+                changed |= self._refresh_entry(path) is not entry
+        except FileNotFoundError:
+            self.refresh()
+            return
+        if changed:
+            # declared name / tags / depends_on may have changed
+            self._rebuild_indexes()
+
+    def _refresh_entry(self, path: str, st: os.stat_result = None) -> CatalogEntry:
+        st = st or os.stat(path)
+        entry = self._entries.get(path)
+        if entry and entry.mtime == st.st_mtime and entry.size == st.st_size:
+            return entry
+
+        with open(path, encoding="utf-8") as f:
+            testcase = parse_testcase(f.read())
+        base_name = os.path.basename(path)[:-len(".txt")]
+        testcase.name = testcase.name or base_name
+        entry = CatalogEntry(
+            name=testcase.name,
+            path=path,
+            mtime=st.st_mtime,
+            size=st.st_size,
+            testcase=testcase,
+        )
+        self._entries[path] = entry
+        return entry
+
+    def _rebuild_indexes(self):
+        index: Dict[str, str] = {}
+        for path in sorted(self._entries):
+            base_name = os.path.basename(path)[:-len(".txt")]
+            index[base_name] = path
+        for path in sorted(self._entries):
+            name = self._entries[path].name
+            if name in index and index[name] != path:
+                logger.warning(f"Testcase name '{name}' declared in {path} is already used by {index[name]}")
+                continue
+            index[name] = path
+        self._index = index
+
+        dependents: Dict[str, Set[str]] = {}
+        for entry in self._entries.values():
+            for dep in entry.testcase.depends_on:
+                dep_name = self._entries[index[dep]].name if dep in index else dep
+                dependents.setdefault(dep_name, set()).add(entry.name)
+        self._dependents = dependents
+
+    # ─────────── lookups ───────────
+
+    def path_for(self, testcase_name: str) -> str:
+        name = testcase_name[:-len(".txt")] if testcase_name.endswith(".txt") else testcase_name
+        self._ensure_scanned()
+        if name not in self._index:
+            self.refresh()
+        if name not in self._index:
+            return os.path.join(self.testcase_dir, f"{name}.txt")
+        return self._index[name]
+
+    def exists(self, testcase_name: str) -> bool:
+        """True for a declared testcase name or file-name alias in the catalog."""
+        return self.path_for(testcase_name) in self._entries
+
+    def canonical_name(self, testcase_name: str) -> str:
+        """Declared @testcase name for a name or file-name alias."""
+        path = self.path_for(testcase_name)
+        entry = self._entries.get(path)
+        return entry.name if entry else testcase_name.replace(".txt", "")
 
     def load(self, testcase_name: str) -> TestCase:
         """
         Load testcase from file and return TestCase object
         """
-        if not testcase_name.endswith(".txt"):
-            filename = f"{testcase_name}.txt"
-        else:
-            filename = testcase_name
-
-        path = os.path.join(self.testcase_dir, filename)
+        path = self.path_for(testcase_name)
 
         if not os.path.exists(path):
             raise FileNotFoundError(f"Testcase not found: {path}")
 
-        with open(path, encoding="utf-8") as f:
-            content = f.read()
+        previous = self._entries.get(path)
+        entry = self._refresh_entry(path)
+        if entry is not previous:
+            # edited in place → declared name / depends_on may have changed
+            self._rebuild_indexes()
+        return entry.testcase
+
+    def list_names(self) -> List[str]:
+        """All declared testcase names in the testcase directory."""
+        self._ensure_scanned()
+        return sorted(entry.name for entry in self._entries.values())
+
+    def with_tag(self, tag: str) -> List[str]:
+        self._ensure_scanned()
+        return sorted(e.name for e in self._entries.values() if tag in e.testcase.tags)
 
-        testcase = parse_testcase(content)
+    def dependents(self, testcase_name: str) -> List[str]:
+        """Testcases that directly depend on testcase_name."""
+        name = self.canonical_name(testcase_name)
+        return sorted(self._dependents.get(name, ()))
 
-        # Ensure name consistency
-        testcase.name = testcase_name.replace(".txt", "")
-        return testcase
+    def all_dependents(self, testcase_name: str) -> List[str]:
+        """Every testcase that depends on testcase_name, directly or transitively."""
+        name = self.canonical_name(testcase_name)
+        seen, stack = set(), [name]
+        while stack:
+            for dependent in self._dependents.get(stack.pop(), ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.append(dependent)
+        return sorted(seen)
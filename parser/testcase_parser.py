@@ -2,11 +2,14 @@
 
 from parser.dsl_models import TestCase, Step
 
+SKIPPABLE_PREFIX = "[skippable]"
+
 def parse_testcase(text: str) -> TestCase:
     lines = [l.strip() for l in text.splitlines() if l.strip()]
 
     name = None
     depends_on = []
+    tags = []
     pre, run, finally_ = [], [], []
     # continue implementing parsing two parameters
     max_wait = 120  # default 120 minutes
@@ -21,6 +24,9 @@ def parse_testcase(text: str) -> TestCase:
         elif line.startswith("@depends_on"):
             depends_on = line.split()[1:]
 
+        elif line.startswith("@tags"):
+            tags = line.split()[1:]
+
         elif line.startswith("@max_wait"):
             try:
                 max_wait = int(line.split()[1])
@@ -43,9 +49,13 @@ def parse_testcase(text: str) -> TestCase:
             section = "finally"
 
         else:
+            skippable = line.startswith(SKIPPABLE_PREFIX)
+            if skippable:
+                line = line[len(SKIPPABLE_PREFIX):].strip()
             step = Step(
                 text=line,
-                is_physical=line.startswith("[physical]")
+                is_physical=line.startswith("[physical]"),
+                skippable=skippable,
             )
 
             if section == "pre":
@@ -63,4 +73,5 @@ def parse_testcase(text: str) -> TestCase:
         finally_=finally_,
         max_wait=max_wait,
         poll_interval=poll_interval,
+        tags=tags,
     )
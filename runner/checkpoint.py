@@ -0,0 +1,97 @@
+import hashlib
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from runner.json_file import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ("pre", "run", "finally")
+
+
+def file_hash(path: str) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+class RunCheckpoint:
+    """
+    Progress of one orchestrator run, so a failed run can be resumed.
+
+    Stored as storage/runs/<run-id>/<testcase>.json (one file per testcase,
+    so sharded worker processes never write the same file). Per testcase it
+    records the final status, completed sections and the last passed UI
+    step. Progress is dropped when the testcase file changes.
+    """
+    def __init__(self, run_id: str = None, directory: str = "./storage/runs"):
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.dir = Path(directory) / self.run_id
+        self._states: Dict[str, dict] = {}
+
+    @classmethod
+    def resume(cls, run_id: str, directory: str = "./storage/runs") -> "RunCheckpoint":
+        checkpoint = cls(run_id, directory)
+        if not checkpoint.dir.is_dir():
+            raise FileNotFoundError(f"No checkpoint for run '{run_id}' in {directory}")
+        return checkpoint
+
+    def _path(self, name: str) -> Path:
+        return self.dir / f"{name}.json"
+
+    def _state(self, name: str) -> dict:
+        if name not in self._states:
+            self._states[name] = read_json(self._path(name), "checkpoint")
+        return self._states[name]
+
+    def _save(self, name: str):
+        write_json(self._path(name), self._states[name])
+
+    # ─────────── testcase level ───────────
+
+    def begin(self, name: str, content_hash: str):
+        """Start (or continue) a testcase; stale progress from an edited file is dropped."""
+        state = self._state(name)
+        if state.get("hash") != content_hash:
+            state.clear()
+            state.update(hash=content_hash, sections=[], last_step=0)
+        state["status"] = None
+        self._save(name)
+
+    def passed(self, name: str, content_hash: str) -> Optional[dict]:
+        state = self._state(name)
+        if state.get("status") == "passed" and state.get("hash") == content_hash:
+            return state
+        return None
+
+    def finish(self, name: str, status: str):
+        state = self._state(name)
+        state["status"] = status
+        state["recorded_at"] = time.time()
+        self._save(name)
+
+    # ─────────── section / step level ───────────
+
+    def section_done(self, name: str, section: str) -> bool:
+        return section in self._state(name).get("sections", [])
+
+    def mark_section(self, name: str, section: str):
+        state = self._state(name)
+        if section not in state.setdefault("sections", []):
+            state["sections"].append(section)
+            self._save(name)
+
+    def last_step(self, name: str) -> int:
+        """1-based index of the last passed UI step (0 = none)."""
+        return self._state(name).get("last_step", 0)
+
+    def mark_step(self, name: str, step_no: int):
+        state = self._state(name)
+        state["last_step"] = max(state.get("last_step", 0), step_no)
+        self._save(name)
+
+    def skippable_steps(self, name: str, steps: List) -> set:
+        """Already-passed UI steps that are declared [skippable]."""
+        last = self.last_step(name)
+        return {i for i, step in enumerate(steps[:last], start=1) if step.skippable}
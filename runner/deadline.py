@@ -0,0 +1,84 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """The time budget ran out; `where` names the step/command that overran."""
+    def __init__(self, label: str, where: str = None):
+        self.label = label
+        self.where = where
+        message = f"Deadline exceeded ({label})"
+        if where:
+            message += f" at {where}"
+        super().__init__(message)
+
+
+@dataclass
+class Deadline:
+    expires_at: float   # wall clock (time.time()) so it can be sent to worker processes
+    label: str
+
+    @classmethod
+    def after(cls, seconds: float, label: str, parent: "Deadline" = None) -> "Deadline":
+        """New deadline `seconds` from now, never later than its parent."""
+        expires_at = time.time() + seconds
+        if parent and parent.expires_at < expires_at:
+            return parent
+        return cls(expires_at, label)
+
+    def remaining(self) -> float:
+        return self.expires_at - time.time()
+
+    def check(self, where: str = None):
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(self.label, where)
+
+
+# Deadline of the current task; asyncio tasks and the non-web thread pool copy it
+_current: ContextVar[Optional[Deadline]] = ContextVar("hybrib_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float], label: str):
+    """Run the block under a deadline nested in the current one (None → inherit only)."""
+    parent = _current.get()
+    if seconds is None:
+        yield parent
+        return
+    deadline = Deadline.after(seconds, label, parent)
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def use_deadline(deadline: Optional[Deadline]):
+    """Install an existing deadline (e.g. a suite budget received by a worker)."""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def remaining_timeout(default: Optional[float], where: str = None) -> Optional[float]:
+    """
+    Timeout (seconds) for a blocking call: `default` capped by the current
+    deadline. Raises DeadlineExceeded if the budget is already spent.
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return default
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded(deadline.label, where)
+    return remaining if default is None else min(default, remaining)
@@ -0,0 +1,28 @@
+import json
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def read_json(path, what: str = "file", default=None):
+    """Parsed JSON at `path`; `default` ({} if None) when missing or unreadable."""
+    path = Path(path)
+    default = {} if default is None else default
+    if not path.exists():
+        return default
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable {what} {path}: {e}")
+        return default
+
+
+def write_json(path, data):
+    """Write JSON atomically (temp file + os.replace), creating the directory."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
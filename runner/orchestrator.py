@@ -1,87 +1,265 @@
-from typing import Dict
+import asyncio
+import time
+from typing import Dict, List
 from parser.test import TestCase, TestStatus
+from runner.result_cache import ResultCache
+from runner.checkpoint import RunCheckpoint, file_hash
+from runner.deadline import Deadline, DeadlineExceeded, deadline_scope, use_deadline
 import logging
 
 logger = logging.getLogger(__name__)
+
+# Testcase budget = @max_wait (the long wait step) + this for login, PRE, FINALLY...
+TESTCASE_OVERHEAD_MIN = 30
+
 class TestOrchestrator:
 
-    def __init__(self, loader, executor,fail_fast: bool = True):
+    def __init__(
+        self,
+        loader,
+        executor,
+        fail_fast: bool = True,
+        max_workers: int = 1,
+        result_cache: ResultCache = None,
+        pipeline: bool = True,
+        checkpoint: RunCheckpoint = None,
+        deadline: Deadline = None,
+    ):
         """
-        loader   → TestCaseLoader
-        executor → TestCaseExecutor (PRE/RUN/FINALLY runner)
+        loader       → TestCaseLoader
+        executor     → TestCaseExecutor (PRE/RUN/FINALLY runner)
+        max_workers  → testcases allowed to run concurrently
+        result_cache → ResultCache reused for dependencies across runs
+        pipeline     → warm up the browser while PRE steps run
+        checkpoint   → RunCheckpoint recording progress (resumed when it has some)
+        deadline     → suite budget; every testcase also gets its own budget
         """
         self.loader = loader
         self.executor = executor
         self.results: Dict[str, TestStatus] = {}
         self.stack = set()  # circular dependency protection
         self.fail_fast = fail_fast
+        self.max_workers = max(1, max_workers)
+        self.result_cache = result_cache
+        self.reused: Dict[str, dict] = {}  # dependency → cache entry it was reused from
+        self.durations: Dict[str, float] = {}  # seconds per executed testcase
+        self.pipeline = pipeline
+        self.checkpoint = checkpoint
+        self.deadline = deadline
+
+    def build_dag(self, targets: List[str]) -> Dict[str, TestCase]:
+        """
+        Load every testcase reachable from targets.
+        Returned dict is in topological order (dependencies first).
+        """
+        dag: Dict[str, TestCase] = {}
+
+        def visit(name: str):
+            # declared @testcase name and file-name alias map to one node
+            name = self.loader.canonical_name(name)
+            if name in dag:
+                return
+            # Circular dependency detection
+            if name in self.stack:
+                raise RuntimeError(f"Circular dependency detected: {name}")
+            self.stack.add(name)
+            try:
+                testcase = self.loader.load(name)
+                testcase.depends_on = [self.loader.canonical_name(d) for d in testcase.depends_on]
+                for dep in testcase.depends_on:
+                    visit(dep)
+                dag[name] = testcase
+            finally:
+                self.stack.discard(name)
+
+        for target in targets:
+            visit(target)
+        return dag
 
     async def run_testcase(self, testcase_name: str) -> TestStatus:
-        # Already executed → reuse result
-        if testcase_name in self.results:
-            return self.results[testcase_name]
+        statuses = await self.run_testcases([testcase_name])
+        return statuses[self.loader.canonical_name(testcase_name)]
 
-        # Circular dependency detection
-        if testcase_name in self.stack:
-            raise RuntimeError(f"Circular dependency detected: {testcase_name}")
-        try:
-            self.stack.add(testcase_name)
+    async def run_testcases(self, targets: List[str]) -> Dict[str, TestStatus]:
+        """
+        Run targets and their dependencies. Ready nodes run concurrently
+        (up to max_workers); dependents of a failed node are SKIPPED.
+        """
+        targets = [self.loader.canonical_name(t) for t in targets]
+        dag = self.build_dag(targets)
+        semaphore = asyncio.Semaphore(self.max_workers)
+        tasks: Dict[str, asyncio.Task] = {}
+        failures: List[str] = []
+
+        async def run_node(name: str) -> TestStatus:
+            # Already executed → reuse result
+            if name in self.results:
+                return self.results[name]
 
-            testcase = self.loader.load(testcase_name)
+            testcase = dag[name]
 
-            # 1️⃣ RUN DEPENDENCIES FIRST
-            for dep in testcase.depends_on:
-                dep_status = await self.run_testcase(dep)
+            # 1️⃣ WAIT FOR DEPENDENCIES
+            dep_statuses = await asyncio.gather(*(tasks[dep] for dep in testcase.depends_on))
+            failed_deps = [
+                dep for dep, status in zip(testcase.depends_on, dep_statuses)
+                if status != TestStatus.PASSED
+            ]
+            if failed_deps or (self.fail_fast and failures):
+                logger.warning(f"Skipping {name}: dependency failed {failed_deps or failures}")
+                self.results[name] = TestStatus.SKIPPED
+                return TestStatus.SKIPPED
 
-                if dep_status != TestStatus.PASSED:
-                    self.results[testcase_name] = TestStatus.SKIPPED
-                    if self.fail_fast:
-                        raise RuntimeError(f"Dependency failed: {dep}")
-                    return TestStatus.SKIPPED
+            # 2️⃣ REUSE A FRESH PASSED RESULT FROM A PREVIOUS RUN (dependencies only)
+            content_hash = None
+            if self.result_cache:
+                content_hash = self.result_cache.content_hash(self.loader.path_for(name))
+                entry = self.result_cache.get_fresh(name, content_hash)
+                if entry and name not in targets:
+                    print(f"♻️  Reusing cached PASSED result for dependency: {name}")
+                    self.reused[name] = entry
+                    self.results[name] = TestStatus.PASSED
+                    return TestStatus.PASSED
 
-            # 2️⃣ RUN THIS TESTCASE
-            status = await self._execute_testcase(testcase)
-            if self.fail_fast and status != TestStatus.PASSED:
-                raise RuntimeError(f"Testcase failed: {testcase_name}")
+            # 3️⃣ ALREADY PASSED IN THE RUN BEING RESUMED
+            if self.checkpoint:
+                checkpoint_hash = file_hash(self.loader.path_for(name))
+                entry = self.checkpoint.passed(name, checkpoint_hash)
+                if entry:
+                    print(f"⏭️  Resuming: {name} already PASSED in run {self.checkpoint.run_id}")
+                    self.reused[name] = entry
+                    self.results[name] = TestStatus.PASSED
+                    return TestStatus.PASSED
+                self.checkpoint.begin(name, checkpoint_hash)
 
-            self.results[testcase_name] = status
+            # 4️⃣ RUN THIS TESTCASE
+            async with semaphore:
+                if self.fail_fast and failures:
+                    status = TestStatus.SKIPPED
+                elif self.deadline and self.deadline.remaining() <= 0:
+                    logger.warning(f"Skipping {name}: suite budget exhausted")
+                    status = TestStatus.SKIPPED
+                else:
+                    started = time.perf_counter()
+                    status = await self._execute_testcase(testcase)
+                    self.durations[name] = time.perf_counter() - started
+                    if self.result_cache:
+                        self.result_cache.record(
+                            name, content_hash, status.value,
+                            duration=self.durations[name],
+                        )
+                if self.checkpoint:
+                    self.checkpoint.finish(name, status.value)
+
+            if status == TestStatus.FAILED:
+                failures.append(name)
+            self.results[name] = status
             return status
-        finally:
-            if testcase_name in self.stack:
-                self.stack.remove(testcase_name)
-    
+
+        # Tasks copy the context, so each node sees the suite deadline
+        with use_deadline(self.deadline):
+            for name in dag:
+                tasks[name] = asyncio.create_task(run_node(name))
+        await asyncio.gather(*tasks.values())
+
+        if self.fail_fast and failures:
+            raise RuntimeError(f"Testcase failed: {failures[0]}")
+
+        return {name: self.results[name] for name in targets}
+
     async def _execute_testcase(self, testcase: TestCase) -> TestStatus:
+        budget_s = (testcase.max_wait + TESTCASE_OVERHEAD_MIN) * 60
+        with deadline_scope(budget_s, f"testcase {testcase.name}"):
+            return await self._execute_sections(testcase)
+
+    async def _execute_sections(self, testcase: TestCase) -> TestStatus:
         logger.info(f"▶ Executing testcase: {testcase.name}")
         print(f"testcase : {testcase}")
 
+        # Browser start + app navigation overlap with PRE; UI steps still wait for PRE
+        warm_task = None
+        if self.pipeline and testcase.pre and testcase.run:
+            warm_task = asyncio.create_task(self.executor.warm_stagehand())
+
+        name = testcase.name
         try:
             # 1️⃣ PRE steps
-            if testcase.pre:
+            if testcase.pre and not self._resume_skips(name, "pre", testcase.pre):
                 print("Running PRE steps...")
-                pre_result = await self.executor.run_pre(testcase.pre)
-                if not pre_result.passed:
+                pre_result = await self.executor.run_pre(testcase.pre, self.loader.path_for(name))
+                if not pre_result or not pre_result.passed:
                     logger.error(f"PRE steps failed for testcase: {testcase.name}")
                     return TestStatus.FAILED
+                self._mark_section(name, "pre")
 
             # 2️⃣ STAGEHAND steps
-            if testcase.run:
+            if testcase.run and not self._resume_skips(name, "run", testcase.run):
                 print("Running STAGEHAND steps...")
-                stagehand_result = await self.executor.run_stagehand(testcase.run)
+                lease = await self._take_warm_lease(warm_task)
+                warm_task = None  # the lease now belongs to run_stagehand
+                skip_steps, on_step_passed = None, None
+                if self.checkpoint:
+                    skip_steps = self.checkpoint.skippable_steps(name, testcase.run)
+                    on_step_passed = lambda idx: self.checkpoint.mark_step(name, idx)
+                stagehand_result = await self.executor.run_stagehand(
+                    testcase.run,
+                    max_wait=testcase.max_wait,
+                    poll_interval=testcase.poll_interval,
+                    lease=lease,
+                    skip_steps=skip_steps,
+                    on_step_passed=on_step_passed,
+                )
                 if not stagehand_result:
                     logger.error(f"STAGEHAND steps failed for testcase: {testcase.name}")
                     return TestStatus.FAILED
+                self._mark_section(name, "run")
 
             # 3️⃣ FINALLY steps
-            if testcase.finally_:
+            if testcase.finally_ and not self._resume_skips(name, "finally", testcase.finally_):
                 print("Running FINALLY steps...")
-                finally_result = await self.executor.run_finally(testcase.finally_)
-                if not finally_result:
+                finally_result = await self.executor.run_finally(testcase.finally_, self.loader.path_for(name))
+                if not finally_result or not finally_result.passed:
                     logger.error(f"FINALLY steps failed for testcase: {testcase.name}")
                     return TestStatus.FAILED
+                self._mark_section(name, "finally")
 
             return TestStatus.PASSED
 
+        except DeadlineExceeded as e:
+            logger.error(f"{testcase.name}: {e}")
+            return TestStatus.FAILED
+
         except Exception as e:
             logger.exception(f"Testcase execution error: {testcase.name} → {e}")
             return TestStatus.FAILED
 
+        finally:
+            # PRE failed (or raised) → hand the warmed lease back to the pool.
+            # Not cancelled: a half-opened page would leak the pooled browser.
+            if warm_task:
+                lease = await self._take_warm_lease(warm_task)
+                if lease:
+                    await self.executor.discard_warm(lease)
+
+    def _resume_skips(self, name: str, section: str, steps) -> bool:
+        """A completed section is skipped on resume only if every step in it is [skippable]."""
+        if not self.checkpoint or not self.checkpoint.section_done(name, section):
+            return False
+        if not all(step.skippable for step in steps):
+            return False
+        print(f"⏭️  Skipping {section.upper()} of {name} (completed before resume)")
+        return True
+
+    def _mark_section(self, name: str, section: str):
+        if self.checkpoint:
+            self.checkpoint.mark_section(name, section)
+
+    async def _take_warm_lease(self, warm_task):
+        """Lease from a warm-up task, or None (not started or failed)."""
+        if warm_task is None:
+            return None
+        try:
+            return await warm_task
+        except Exception as e:
+            logger.warning(f"Browser warm-up failed, starting it after PRE instead: {e}")
+            return None
+
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from runner.json_file import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    On-disk cache of testcase results across runs.
+
+    Entries are keyed by testcase name plus a content hash of the testcase
+    file and data.json. Only a fresh (within TTL) PASSED entry with the
+    same hash is reused, so editing the testcase or the target environment
+    invalidates it automatically.
+    """
+    def __init__(
+        self,
+        path: str = "./storage/results_cache.json",
+        ttl_hours: float = 24,
+        data_path: str = "./storage/data.json",
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_hours * 3600
+        self.data_path = Path(data_path)
+        self.entries: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        return read_json(self.path, "result cache")
+
+    def _save(self):
+        write_json(self.path, self.entries)
+
+    def content_hash(self, testcase_path: str) -> str:
+        digest = hashlib.sha256(Path(testcase_path).read_bytes())
+        if self.data_path.exists():
+            data = json.loads(self.data_path.read_text(encoding="utf-8"))
+            digest.update(json.dumps(data, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def get_fresh(self, name: str, content_hash: str) -> Optional[dict]:
+        entry = self.entries.get(name)
+        if not entry:
+            return None
+        if entry["hash"] != content_hash or entry["status"] != "passed":
+            return None
+        if time.time() - entry["recorded_at"] > self.ttl_seconds:
+            return None
+        return entry
+
+    def record(self, name: str, content_hash: str, status: str, duration: float = None):
+        # Re-read first so records written by other worker processes survive
+        self.entries = self._load()
+        self.entries[name] = {
+            "hash": content_hash,
+            "status": status,
+            "recorded_at": time.time(),
+            "duration": duration,
+        }
+        self._save()
+
+    def invalidate(self, names: Iterable[str] = None) -> int:
+        """Drop the given entries (all when names is empty); returns the count."""
+        names = list(names or [])
+        if not names:
+            count = len(self.entries)
+            self.entries = {}
+        else:
+            count = sum(1 for n in names if self.entries.pop(n, None) is not None)
+        self._save()
+        return count
@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import multiprocessing as mp
+import queue
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from parser.test import TestCase, TestStatus
+from parser.testcase_loader import TestCaseLoader
+from runner.orchestrator import TestOrchestrator
+from runner.result_cache import ResultCache
+from runner.checkpoint import RunCheckpoint
+from runner.deadline import Deadline
+from runner.testcase_executor import TestCaseExecutor
+
+logger = logging.getLogger(__name__)
+
+POLL_S = 1.0
+DEFAULT_SHARD_WEIGHT_S = 60  # testcases without a recorded duration
+
+
+@dataclass
+class WorkerOptions:
+    testcase_dir: str = "./testcase"
+    workers: int = 1                         # in-process concurrency per worker
+    recycle_after: int = 20
+    lookahead: int = 0
+    batch_observe: bool = True
+    pipeline: bool = True
+    cache_ttl_hours: Optional[float] = 24    # None → no result cache
+    llm_cache: bool = False
+    compiled_plans: bool = True
+    run_id: Optional[str] = None             # checkpoint run shared by all workers
+    deadline: Optional[Deadline] = None      # suite budget (wall clock, valid across processes)
+
+
+def shard_dag(dag: Dict[str, TestCase], durations: Dict[str, float] = None) -> List[List[str]]:
+    """
+    Split the DAG into weakly connected components so every dependency chain
+    stays on one worker. Each shard keeps the DAG's topological order;
+    shards are returned heaviest first (by recorded durations).
+    """
+    durations = durations or {}
+    parent = {name: name for name in dag}
+
+    def find(name):
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    for name, testcase in dag.items():
+        for dep in testcase.depends_on:
+            parent[find(name)] = find(dep)
+
+    shards: Dict[str, List[str]] = {}
+    for name in dag:
+        shards.setdefault(find(name), []).append(name)
+
+    def weight(shard):
+        return sum(durations.get(n) or DEFAULT_SHARD_WEIGHT_S for n in shard)
+
+    return sorted(shards.values(), key=weight, reverse=True)
+
+
+def _worker_main(worker_id: int, options: WorkerOptions, tasks, results):
+    asyncio.run(_worker_loop(worker_id, options, tasks, results))
+
+
+async def _worker_loop(worker_id: int, options: WorkerOptions, tasks, results):
+    """Run shards until the sentinel arrives; the browser pool lives across shards."""
+    loader = TestCaseLoader(testcase_dir=options.testcase_dir)
+    executor = TestCaseExecutor(
+        browser_pool_size=options.workers,
+        recycle_after=options.recycle_after,
+        lookahead=options.lookahead,
+        batch_observe=options.batch_observe,
+        llm_cache=options.llm_cache,
+        compiled_plans=options.compiled_plans,
+    )
+    result_cache = None
+    if options.cache_ttl_hours is not None:
+        result_cache = ResultCache(ttl_hours=options.cache_ttl_hours)
+    checkpoint = RunCheckpoint(options.run_id) if options.run_id else None
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            shard_id, targets = task
+            results.put(("started", worker_id, shard_id))
+
+            orchestrator = TestOrchestrator(
+                loader,
+                executor,
+                fail_fast=False,
+                max_workers=options.workers,
+                result_cache=result_cache,
+                pipeline=options.pipeline,
+                checkpoint=checkpoint,
+                deadline=options.deadline,
+            )
+            try:
+                await orchestrator.run_testcases(targets)
+            except Exception as e:
+                logger.exception(f"Worker {worker_id} failed on shard {shard_id}: {e}")
+
+            results.put(("done", worker_id, shard_id, {
+                "results": {name: status.value for name, status in orchestrator.results.items()},
+                "durations": orchestrator.durations,
+                "reused": orchestrator.reused,
+            }))
+    finally:
+        await executor.close()
+
+
+class ShardedRunner:
+    """
+    Coordinator for multi-process execution of the testcase DAG.
+
+    The DAG is partitioned with shard_dag() and the shards are handed out
+    to `processes` worker processes over a multiprocessing queue. Each
+    worker keeps its browser pool across shards. results / durations /
+    reused mirror TestOrchestrator so the same summary can be printed.
+    """
+    def __init__(self, loader, processes: int, options: WorkerOptions):
+        self.loader = loader
+        self.processes = max(1, processes)
+        self.options = options
+        self.results: Dict[str, TestStatus] = {}
+        self.durations: Dict[str, float] = {}
+        self.reused: Dict[str, dict] = {}
+        self.shard_workers: Dict[int, int] = {}  # shard → worker that ran it
+
+    async def run_testcases(self, targets: List[str]) -> Dict[str, TestStatus]:
+        targets = [self.loader.canonical_name(t) for t in targets]
+        dag = TestOrchestrator(self.loader, executor=None).build_dag(targets)
+
+        recorded = {}
+        if self.options.cache_ttl_hours is not None:
+            recorded = {n: e.get("duration") for n, e in ResultCache().entries.items()}
+        shards = shard_dag(dag, recorded)
+        processes = min(self.processes, len(shards))
+        print(f"🧩 {len(dag)} testcase(s) in {len(shards)} shard(s) across {processes} worker process(es)")
+
+        # spawn: workers must not inherit the coordinator's event loop / threads
+        ctx = mp.get_context("spawn")
+        tasks, results = ctx.Queue(), ctx.Queue()
+        for shard_id, shard in enumerate(shards):
+            tasks.put((shard_id, [n for n in shard if n in targets]))
+        for _ in range(processes):
+            tasks.put(None)
+
+        workers = [
+            ctx.Process(
+                target=_worker_main,
+                args=(i, self.options, tasks, results),
+                name=f"hybrib-worker-{i}",
+            )
+            for i in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        started = time.perf_counter()
+        pending = set(range(len(shards)))
+        in_flight: Dict[int, int] = {}  # worker → shard
+        try:
+            while pending:
+                try:
+                    message = await asyncio.to_thread(results.get, True, POLL_S)
+                except queue.Empty:
+                    self._reap_dead_workers(workers, in_flight, pending, shards)
+                    continue
+
+                kind, worker_id, shard_id = message[:3]
+                if kind == "started":
+                    in_flight[worker_id] = shard_id
+                    self.shard_workers[shard_id] = worker_id
+                    print(f"▶ Shard {shard_id} ({len(shards[shard_id])} testcase(s)) → worker {worker_id}")
+                    continue
+
+                in_flight.pop(worker_id, None)
+                pending.discard(shard_id)
+                self._merge(shards[shard_id], message[3])
+                elapsed = time.perf_counter() - started
+                print(f"✔ Shard {shard_id} finished on worker {worker_id} ({elapsed:.1f}s since start)")
+        finally:
+            for worker in workers:
+                worker.join(timeout=30)
+                if worker.is_alive():
+                    logger.warning(f"Terminating stuck worker {worker.name}")
+                    worker.terminate()
+
+        return {name: self.results[name] for name in targets}
+
+    def _merge(self, shard: List[str], payload: dict):
+        for name in shard:
+            status = payload["results"].get(name)
+            self.results[name] = TestStatus(status) if status else TestStatus.FAILED
+        self.durations.update(payload["durations"])
+        self.reused.update(payload["reused"])
+
+    def _reap_dead_workers(self, workers, in_flight, pending, shards):
+        """Fail shards whose worker died; if every worker is gone, fail the rest."""
+        for worker_id, worker in enumerate(workers):
+            if not worker.is_alive() and worker_id in in_flight:
+                shard_id = in_flight.pop(worker_id)
+                logger.error(f"Worker {worker_id} died (exit code {worker.exitcode}) running shard {shard_id}")
+                pending.discard(shard_id)
+                self._merge(shards[shard_id], {"results": {}, "durations": {}, "reused": {}})
+
+        if pending and not any(worker.is_alive() for worker in workers):
+            logger.error(f"All workers exited with {len(pending)} shard(s) unfinished")
+            for shard_id in list(pending):
+                pending.discard(shard_id)
+                self._merge(shards[shard_id], {"results": {}, "durations": {}, "reused": {}})
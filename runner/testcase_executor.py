@@ -1,21 +1,79 @@
 # runner/testcase_executor.py
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 from parser.test import TestStatus
 from parser.dsl_models import TestCase
-from stage_hand.stagehand_runner import process
+from stage_hand.stagehand_runner import process, warm_up
+from stage_hand.browser_pool import BrowserPool, BrowserLease
 import logging
+from typing import List
 from non_web.main import non_web_main
+from non_web.session import NonWebSession
+from non_web.agent.llm_cache import LLMResponseCache
+from non_web.agent.llm_gateway import shared_gateway
+from non_web.agent.plan_store import CompiledPlanStore
+from config.config import api_key
 
 logger = logging.getLogger(__name__)
 
 class TestCaseExecutor:
 
+    def __init__(
+        self,
+        browser_pool_size: int = 1,
+        recycle_after: int = 20,
+        lookahead: int = 0,
+        batch_observe: bool = True,
+        non_web_threads: int = 4,
+        llm_cache: bool = False,
+        compiled_plans: bool = True,
+    ):
+        # One browser pool for the whole orchestrator run
+        self.browser_pool = BrowserPool(size=browser_pool_size, recycle_after=recycle_after)
+        # Steps to speculatively observe ahead (0 = off)
+        self.lookahead = lookahead
+        # Resolve same-screen steps with one observe call
+        self.batch_observe = batch_observe
+        # Blocking LLM / SSH / subprocess calls of the non-web agent run here
+        self.non_web_pool = ThreadPoolExecutor(
+            max_workers=max(1, non_web_threads), thread_name_prefix="non-web"
+        )
+        # Non-web agent stacks reused across PRE/FINALLY; one per concurrent section
+        self.non_web_sessions: List[NonWebSession] = []
+        self._idle_sessions: List[NonWebSession] = []
+        # Opt-in planning response cache shared by all sessions
+        self.llm_cache = LLMResponseCache() if llm_cache else None
+        # The process-wide LLM gateway (concurrency/rate limits, retries) for every session
+        self.llm_gateway = shared_gateway(api_key)
+        # Reuse compiled PRE/FINALLY action lists stored next to the testcase
+        self.compiled_plans = compiled_plans
+
+    async def _run_non_web(self, steps, testcase_path: str = None):
+        plans = None
+        if self.compiled_plans and testcase_path:
+            plans = CompiledPlanStore.for_testcase(testcase_path)
+
+        if self._idle_sessions:
+            session = self._idle_sessions.pop()
+        else:
+            session = NonWebSession(
+                api_key,
+                blocking_pool=self.non_web_pool,
+                llm_cache=self.llm_cache,
+                llm_gateway=self.llm_gateway,
+            )
+            self.non_web_sessions.append(session)
+        try:
+            return await non_web_main(steps, session=session, plans=plans)
+        finally:
+            self._idle_sessions.append(session)
+
     async def execute(self, testcase: TestCase) -> TestStatus:
         logger.info(f"Running PRE for {testcase.name}")
         try:
             await self.run_pre(testcase.pre)
-            await self.run_stagehand(testcase.run)
+            await self.run_stagehand(testcase.run, testcase.max_wait, testcase.poll_interval)
             run_passed = True
         except Exception as e:
             logger.error(f"RUN failed: {e}")
@@ -30,31 +88,66 @@ class TestCaseExecutor:
         logger.error(f"❌ FAILED: {testcase.name}")
         return TestStatus.FAILED
 
-    async def run_pre(self, steps):
+    async def run_pre(self, steps, testcase_path: str = None):
         print("Running PRE steps...")
         try:
-            result = await non_web_main(steps)
+            result = await self._run_non_web(steps, testcase_path)
             return result
         except Exception as e:
             logger.error(f"PRE steps failed: {e}")
 
         # real PRE logic here
 
-    async def run_stagehand(self, steps):
+    async def warm_stagehand(self) -> BrowserLease:
+        """Start the browser and load the app while PRE is still running."""
+        return await warm_up(self.browser_pool)
+
+    async def discard_warm(self, lease: BrowserLease):
+        """Return a warmed lease that will not be used (e.g. PRE failed)."""
+        await self.browser_pool.release(lease)
+
+    async def run_stagehand(
+        self,
+        steps,
+        max_wait: float = 60,
+        poll_interval: float = 3,
+        lease: BrowserLease = None,
+        skip_steps=None,
+        on_step_passed=None,
+    ):
         # page.act / observe here
         print("Running STAGEHAND steps...")
         try:
-            result = await process(steps, "ai")
+            result = await process(
+                steps, "ai",
+                pool=self.browser_pool,
+                lease=lease,
+                skip_steps=skip_steps,
+                on_step_passed=on_step_passed,
+                max_wait=max_wait,
+                poll_interval=poll_interval,
+                lookahead=self.lookahead,
+                batch_observe=self.batch_observe,
+            )
             return result.passed  # True if all steps passed
         except Exception as e:
             logger.error(f"Stagehand steps failed: {e}")
             return False
 
-    async def run_finally(self, steps):
+    async def run_finally(self, steps, testcase_path: str = None):
         print("Running FINALLY steps...")
         try:
-            result = await non_web_main(steps)
+            result = await self._run_non_web(steps, testcase_path)
             return result
         except Exception as e:
             logger.error(f"FINALLY steps failed: {e}")
 
+    async def close(self):
+        for session in self.non_web_sessions:
+            session.close()
+        self.non_web_pool.shutdown(wait=False)
+        print(f"LLM gateway: {self.llm_gateway.stats}")
+        if self.llm_cache:
+            print(f"LLM cache: {self.llm_cache.stats}")
+            self.llm_cache.close()
+        await self.browser_pool.close()
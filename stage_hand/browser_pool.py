@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, List
+from urllib.parse import urlsplit
+
+from stagehand import StagehandConfig, Stagehand
+from config.config import api_key
+
+logger = logging.getLogger(__name__)
+
+VIEWPORT = {"width": 1280, "height": 980}
+HEALTH_CHECK_TIMEOUT_S = 5
+
+
+@dataclass
+class PooledBrowser:
+    stagehand: Any
+    uses: int = 0          # testcases served since launch
+
+
+@dataclass
+class BrowserLease:
+    stagehand: Any
+    page: Any
+    setup_time: float      # seconds spent acquiring + loading the app URL
+    browser: PooledBrowser
+
+
+class BrowserPool:
+    """
+    Keeps Stagehand/Chromium instances alive across testcases.
+
+    Each testcase leases one instance exclusively and gets a fresh page in
+    it. The page has to stay on Stagehand's context (observe/act), so the
+    app origin's cookies, local/session storage, IndexedDB, caches and
+    service workers are cleared before navigating. An instance is closed and
+    relaunched after `recycle_after` testcases, or when its health check fails.
+    """
+    def __init__(self, size: int = 1, recycle_after: int = 20):
+        self.size = max(1, size)
+        self.recycle_after = recycle_after
+        # Idle browsers; None is a wake-up meaning "a browser was disposed"
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._browsers: List[PooledBrowser] = []
+
+    async def acquire(self, url: str) -> BrowserLease:
+        start = time.perf_counter()
+        browser = await self._checkout()
+        try:
+            page = await self._open_page(browser, url)
+        except Exception as e:
+            logger.warning(f"Pooled browser failed health check ({e}); relaunching")
+            await self._dispose(browser)
+            browser = await self._launch()
+            page = await self._open_page(browser, url)
+
+        setup_time = time.perf_counter() - start
+        logger.info(f"Browser lease ready in {setup_time:.2f}s (use #{browser.uses + 1})")
+        return BrowserLease(
+            stagehand=browser.stagehand,
+            page=page,
+            setup_time=setup_time,
+            browser=browser,
+        )
+
+    async def release(self, lease: BrowserLease, healthy: bool = True):
+        browser = lease.browser
+        browser.uses += 1
+        try:
+            await lease.page.close()
+        except Exception as e:
+            logger.debug(f"Closing leased page failed: {e}")
+            healthy = False
+
+        if not healthy or browser.uses >= self.recycle_after:
+            logger.info(f"Recycling browser after {browser.uses} testcase(s)")
+            await self._dispose(browser)
+        else:
+            self._idle.put_nowait(browser)
+
+    async def close(self):
+        for browser in list(self._browsers):
+            await self._dispose(browser)
+        self._idle = asyncio.Queue()
+
+    async def _checkout(self) -> PooledBrowser:
+        while True:
+            if not self._idle.empty():
+                browser = self._idle.get_nowait()
+            elif len(self._browsers) < self.size:
+                return await self._launch()
+            else:
+                browser = await self._idle.get()
+            if browser is not None:
+                return browser
+            # A recycled / failed browser freed its slot → launch a replacement
+            if len(self._browsers) < self.size:
+                return await self._launch()
+
+    async def _launch(self) -> PooledBrowser:
+        config = StagehandConfig(
+            env="LOCAL",
+            model_name="google/gemini-2.5-flash",
+            model_api_key=api_key,
+            ignore_https_errors=True,
+            verbose=2
+        )
+        stagehand = Stagehand(config)
+        browser = PooledBrowser(stagehand=stagehand)
+        self._browsers.append(browser)
+        try:
+            await stagehand.init()
+        except Exception:
+            await self._dispose(browser)
+            raise
+        return browser
+
+    async def _open_page(self, browser: PooledBrowser, url: str):
+        context = browser.stagehand.context
+        await context.clear_cookies()
+        page = await context.new_page()
+        # Health check: the renderer must answer before we navigate
+        await asyncio.wait_for(page.evaluate("1"), HEALTH_CHECK_TIMEOUT_S)
+        await self._clear_origin_storage(page, url)
+        await page.set_viewport_size(VIEWPORT)
+        await page.goto(url)
+        return page
+
+    @staticmethod
+    async def _clear_origin_storage(page, url: str):
+        """Drop everything the previous testcase left for the app origin (e.g. a login token)."""
+        parts = urlsplit(url)
+        if not parts.scheme.startswith("http"):
+            return
+        await page.send_cdp("Storage.clearDataForOrigin", {
+            "origin": f"{parts.scheme}://{parts.netloc}",
+            "storageTypes": "all",
+        })
+
+    async def _dispose(self, browser: PooledBrowser):
+        if browser in self._browsers:
+            self._browsers.remove(browser)
+            # Wake a caller blocked in _checkout: the slot is free again
+            self._idle.put_nowait(None)
+        try:
+            await browser.stagehand.close()
+        except Exception as e:
+            logger.debug(f"Closing pooled browser failed: {e}")
@@ -0,0 +1,86 @@
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Ranked locator kinds recorded for one element (most semantic first)
+CANDIDATE_KINDS = ("role", "label", "text", "testid", "css", "xpath")
+
+# Describes the element at an xpath: role + accessible name, label, text,
+# test id and a stable css selector (ids that look generated are skipped).
+_DESCRIBE_JS = """
+(xpath) => {
+  const el = document.evaluate(xpath, document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+  if (!el) return null;
+  const tag = el.tagName.toLowerCase();
+  const type = (el.getAttribute('type') || '').toLowerCase();
+  const implicit = {
+    button: 'button', select: 'combobox', textarea: 'textbox',
+    a: el.hasAttribute('href') ? 'link' : '',
+    input: ['button', 'submit', 'reset'].includes(type) ? 'button'
+      : type === 'checkbox' ? 'checkbox' : type === 'radio' ? 'radio'
+      : ['', 'text', 'password', 'email', 'search', 'number'].includes(type) ? 'textbox' : '',
+  };
+  const clean = (s) => (s || '').replace(/\\s+/g, ' ').trim();
+  const label = clean(el.labels && el.labels[0] ? el.labels[0].innerText : '');
+  const text = ['input', 'textarea', 'select'].includes(tag) ? '' : clean(el.innerText);
+  const testAttr = ['data-testid', 'data-test', 'data-qa'].find(a => el.hasAttribute(a));
+  const text80 = text.length <= 80 ? text : '';
+  // Attribute values are escaped so quotes in them cannot break the selector
+  const attr = (name, value) => '[' + name + '="' + CSS.escape(value) + '"]';
+  let css = '';
+  if (el.id && !/\\d{3,}|[-_:]\\d+$/.test(el.id)) css = '#' + CSS.escape(el.id);
+  else if (el.getAttribute('name')) css = tag + attr('name', el.getAttribute('name'));
+  return {
+    role: el.getAttribute('role') || implicit[tag] || '',
+    // Never a truncated name: role candidates are matched with exact=True
+    name: clean(el.getAttribute('aria-label')) || label || text80
+      || clean(el.getAttribute('placeholder')) || clean(el.getAttribute('title')),
+    label: label,
+    text: text80,
+    testid: testAttr ? attr(testAttr, el.getAttribute(testAttr)) : '',
+    css: css,
+  };
+}
+"""
+
+
+async def collect_candidates(page, selector: str) -> List[Dict[str, str]]:
+    """Ranked locator candidates for the element behind an observe selector."""
+    if not selector:
+        return []
+    candidates = []
+    if selector.startswith("xpath="):
+        try:
+            info = await page.evaluate(_DESCRIBE_JS, selector[len("xpath="):])
+        except Exception as e:
+            logger.debug(f"Collecting locator candidates failed: {e}")
+            info = None
+        if info:
+            if info["role"] and info["name"]:
+                candidates.append({"kind": "role", "value": info["role"], "name": info["name"]})
+            for kind in ("label", "text", "testid", "css"):
+                if info[kind]:
+                    candidates.append({"kind": kind, "value": info[kind]})
+        candidates.append({"kind": "xpath", "value": selector})
+    else:
+        candidates.append({"kind": "css", "value": selector})
+    return candidates
+
+
+def to_locator(page, candidate: Dict[str, str]):
+    kind, value = candidate["kind"], candidate["value"]
+    if kind == "role":
+        return page.get_by_role(value, name=candidate.get("name"), exact=True)
+    if kind == "label":
+        return page.get_by_label(value, exact=True)
+    if kind == "text":
+        return page.get_by_text(value, exact=True)
+    return page.locator(value)   # testid / css / xpath
+
+
+def rerank(candidates: List[Dict], worked: Dict, failed: List[Dict]) -> List[Dict]:
+    """Promote the candidate that worked, demote the ones that failed."""
+    rest = [c for c in candidates if c is not worked and not any(c is f for f in failed)]
+    return [worked] + rest + failed
@@ -0,0 +1,82 @@
+import logging
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# Structural hash of the visible interactive elements plus the route.
+# Input values are ignored so typing does not change the fingerprint.
+_DOM_FINGERPRINT_JS = """
+() => {
+  const parts = [location.pathname + location.hash];
+  const els = document.querySelectorAll(
+    'a,button,input,select,textarea,label,h1,h2,h3,[role]');
+  for (const el of els) {
+    if (!el.getClientRects().length) continue;
+    const text = (el.innerText || '').trim().slice(0, 40);
+    parts.push(el.tagName + ':' + (el.getAttribute('role') || '') + ':' + text);
+  }
+  const s = parts.join('|');
+  let h = 5381;
+  for (let i = 0; i < s.length; i++) h = ((h << 5) + h + s.charCodeAt(i)) | 0;
+  return (h >>> 0).toString(16) + ':' + parts.length;
+}
+"""
+
+
+async def dom_fingerprint(page) -> str | None:
+    """Cheap fingerprint of what is on screen; None if the page is navigating."""
+    try:
+        return await page.evaluate(_DOM_FINGERPRINT_JS)
+    except Exception as e:
+        logger.debug(f"DOM fingerprint failed: {e}")
+        return None
+
+
+# Route (ids normalized), title and a structural hash of the landmarks
+# (banner/nav/main/dialog/tablist + headings) that are currently visible.
+_PAGE_FINGERPRINT_JS = """
+() => {
+  const norm = (s) => s.replace(/\\/\\d+(?=\\/|$)/g, '/:id');
+  const parts = [];
+  const els = document.querySelectorAll(
+    'header,nav,main,aside,footer,h1,h2,h3,' +
+    '[role=banner],[role=navigation],[role=main],[role=dialog],[role=tablist]');
+  for (const el of els) {
+    if (!el.getClientRects().length) continue;
+    const label = el.getAttribute('aria-label') ||
+      (/^H[1-3]$/.test(el.tagName) ? (el.innerText || '').trim().slice(0, 30) : '');
+    parts.push(el.tagName + ':' + (el.getAttribute('role') || '') + ':' + label);
+  }
+  const s = parts.join('|');
+  let h = 5381;
+  for (let i = 0; i < s.length; i++) h = ((h << 5) + h + s.charCodeAt(i)) | 0;
+  return {
+    route: norm(location.pathname) + norm(location.hash.split('?')[0]),
+    title: document.title,
+    landmarks: (h >>> 0).toString(16) + ':' + parts.length,
+  };
+}
+"""
+
+
+@dataclass
+class PageFingerprint:
+    route: str
+    title: str
+    landmarks: str
+
+    def compare(self, other: "PageFingerprint") -> str:
+        """exact | near (same route, changed screen) | mismatch (other route)"""
+        if other is None or self.route != other.route:
+            return "mismatch"
+        if self.title == other.title and self.landmarks == other.landmarks:
+            return "exact"
+        return "near"
+
+
+async def page_fingerprint(page) -> PageFingerprint | None:
+    try:
+        return PageFingerprint(**await page.evaluate(_PAGE_FINGERPRINT_JS))
+    except Exception as e:
+        logger.debug(f"Page fingerprint failed: {e}")
+        return None
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from stage_hand.page_fingerprint import dom_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Prefetch:
+    task: asyncio.Task
+    fingerprint: Optional[str] = None   # DOM fingerprint when observe started
+
+
+class ObservePrefetcher:
+    """
+    Speculatively runs page.observe for upcoming steps while the current
+    step executes. A prefetched result is only handed out if the page still
+    has the DOM fingerprint it was observed against.
+    """
+    def __init__(self, lookahead: int = 1):
+        self.lookahead = lookahead
+        self._pending: Dict[str, Prefetch] = {}
+        self.stats = {"scheduled": 0, "used": 0, "stale": 0}
+
+    def schedule(self, page, step: str):
+        if step in self._pending:
+            return
+        prefetch = Prefetch(task=None)
+        prefetch.task = asyncio.create_task(self._observe(page, step, prefetch))
+        # Retrieve exceptions of prefetches that are never taken
+        prefetch.task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._pending[step] = prefetch
+        self.stats["scheduled"] += 1
+
+    async def _observe(self, page, step: str, prefetch: Prefetch) -> Any:
+        prefetch.fingerprint = await dom_fingerprint(page)
+        return await page.observe(step)
+
+    async def take(self, page, step: str) -> Optional[Any]:
+        """Return the prefetched observe result for step, or None."""
+        prefetch = self._pending.pop(step, None)
+        if not prefetch:
+            return None
+
+        current = await dom_fingerprint(page)
+        # Fingerprint already known and different → don't wait for the LLM
+        if prefetch.fingerprint is not None and prefetch.fingerprint != current:
+            prefetch.task.cancel()
+            self.stats["stale"] += 1
+            return None
+
+        try:
+            result = await prefetch.task
+        except Exception as e:
+            logger.debug(f"Prefetched observe failed for '{step}': {e}")
+            return None
+
+        if current is None or prefetch.fingerprint != current:
+            self.stats["stale"] += 1
+            return None
+
+        self.stats["used"] += 1
+        print(f"Using prefetched observe for step: {step}")
+        return result
+
+    def cancel_all(self):
+        for prefetch in self._pending.values():
+            prefetch.task.cancel()
+        self._pending.clear()
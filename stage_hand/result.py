@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Optional, List
+from typing import Any, Optional, List, Tuple
 
 @dataclass
 class StepResult:
@@ -8,6 +8,12 @@ class StepResult:
     status: str
     error: Optional[str] = None
     used_agent: bool = False
+    # Snapshot cache counters for this step
+    cache_hits: int = 0
+    cache_misses: int = 0
+    cache_drifts: int = 0
+    settle_ms: Optional[float] = None   # measured UI settle time after the step
+    used_llm: bool = True               # False for fast-path / replayed steps
 
 @dataclass
 class TestResult:
@@ -15,6 +21,19 @@ class TestResult:
     failed_step: Optional[int] = None
     reason: Optional[str] = None
     steps: List[StepResult] = None
+    setup_time: Optional[float] = None  # browser lease + app load (seconds)
+
+    @property
+    def llm_free_counts(self) -> Tuple[int, int]:
+        """(passed steps without any model call, passed steps)."""
+        done = [s for s in (self.steps or []) if s.status == "PASSED"]
+        return sum(1 for s in done if not s.used_llm), len(done)
+
+    @property
+    def llm_free_ratio(self) -> float:
+        """Fraction of executed (PASSED) steps that ran without any model call."""
+        llm_free, done = self.llm_free_counts
+        return llm_free / done if done else 0.0
 
 
 @dataclass
@@ -22,4 +41,6 @@ class EngineActResult:
     success: bool
     used_agent: bool = False
     error: Optional[str] = None
-    raw: Optional[Any] = None   # stagehand / agent result
\ No newline at end of file
+    raw: Optional[Any] = None   # stagehand / agent result
+    cache: Optional[str] = None  # hit | miss | drift (snapshot replay)
+    used_llm: bool = True        # False when resolved without any model call
\ No newline at end of file
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, List, Dict
 import json
 
@@ -11,6 +11,10 @@ class SelectorSnapshot:
     arguments: List[str]          # method args
     description: str              # from observe
     coordinates: Optional[Dict[str, int]] = None  # {"x": 491, "y": 136} for coordinate clicks
+    # Ranked fallback locators: [{"kind": "role", "value": "button", "name": "Log In"}, ...]
+    candidates: List[Dict[str, str]] = field(default_factory=list)
+    # PageFingerprint (route/title/landmarks) of the screen it was recorded on
+    fingerprint: Optional[Dict[str, str]] = None
 
 
     def load_snapshots(path: str) -> Dict[str, "SelectorSnapshot"]:
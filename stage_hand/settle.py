@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUIET_WINDOW_MS = 300      # DOM + network must be quiet this long
+POLL_MS = 50
+STALLED_REQUEST_MS = 2000  # long-poll / streaming requests are ignored after this
+
+# (min_ms, max_ms) per leading verb; anything else uses DEFAULT_BOUNDS
+STEP_BOUNDS: Dict[str, Tuple[int, int]] = {
+    "click": (100, 10000),
+    "press": (100, 10000),
+    "select": (100, 10000),
+    "open": (100, 10000),
+    "ensure": (100, 5000),
+    "type": (0, 2000),
+    "expect": (0, 1000),
+    "verify": (0, 1000),
+    "wait": (0, 2000),
+}
+DEFAULT_BOUNDS = (100, 10000)
+
+# Records the time of the last DOM mutation on window.__hybribSettle.
+# add_init_script runs its source as-is, so it is registered as an IIFE
+# (_INIT_SCRIPT) to reinstall the observer on every new document.
+_OBSERVER_JS = """
+() => {
+  if (window.__hybribSettle) return;
+  // Installing counts as a mutation so the quiet window starts now
+  window.__hybribSettle = { lastMutation: performance.now() };
+  const start = () => new MutationObserver(() => {
+    window.__hybribSettle.lastMutation = performance.now();
+  }).observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+  if (document.documentElement) start();
+  else document.addEventListener('DOMContentLoaded', start);
+}
+"""
+_INIT_SCRIPT = f"({_OBSERVER_JS.strip()})();"
+
+# True when no mutation happened for quietMs and no finite animation is running;
+# null when the observer is missing (not installed in this document yet)
+_DOM_QUIET_JS = """
+(quietMs) => {
+  const s = window.__hybribSettle;
+  if (!s) return null;
+  if (performance.now() - s.lastMutation < quietMs) return false;
+  if (!document.getAnimations) return true;
+  return !document.getAnimations().some(a =>
+    a.playState === 'running' && a.effect &&
+    isFinite(a.effect.getComputedTiming().endTime));
+}
+"""
+
+
+def settle_bounds(instruction: str) -> Tuple[int, int]:
+    words = instruction.strip().lstrip("@").split()
+    verb = words[0].lower() if words else ""
+    if verb == "execute" and len(words) > 1:
+        verb = words[1].lower()
+    return STEP_BOUNDS.get(verb, DEFAULT_BOUNDS)
+
+
+class SettleDetector:
+    """
+    Adaptive replacement for a fixed sleep between UI steps.
+
+    The page is considered settled once there are no in-flight requests,
+    no DOM mutations (MutationObserver) and no finite running animations for
+    QUIET_WINDOW_MS, bounded by a per-step minimum and maximum.
+    """
+    def __init__(self):
+        self.page = None
+        self._inflight: Dict[object, float] = {}
+        self._last_network = 0.0
+
+    async def attach(self, page):
+        self.page = page
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_request_done)
+        page.on("requestfailed", self._on_request_done)
+        await page.add_init_script(_INIT_SCRIPT)
+        await page.evaluate(_OBSERVER_JS)
+
+    def _on_request(self, request):
+        now = time.perf_counter()
+        self._inflight[request] = now
+        self._last_network = now
+
+    def _on_request_done(self, request):
+        self._inflight.pop(request, None)
+        self._last_network = time.perf_counter()
+
+    def _network_quiet(self, now: float) -> bool:
+        active = [
+            started for started in self._inflight.values()
+            if (now - started) * 1000 < STALLED_REQUEST_MS
+        ]
+        return not active and (now - self._last_network) * 1000 >= QUIET_WINDOW_MS
+
+    async def wait(self, min_ms: int, max_ms: int) -> float:
+        """Wait until the page settles; returns the measured settle time (ms)."""
+        start = time.perf_counter()
+        deadline = start + max_ms / 1000
+
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                logger.debug(f"Page did not settle within {max_ms}ms")
+                break
+            if (now - start) * 1000 >= min_ms and self._network_quiet(now):
+                try:
+                    quiet = await self.page.evaluate(_DOM_QUIET_JS, QUIET_WINDOW_MS)
+                    if quiet is None:
+                        # No observer → not quiet; install it and keep waiting
+                        await self.page.evaluate(_OBSERVER_JS)
+                    elif quiet:
+                        break
+                except Exception as e:
+                    # Navigation in progress → execution context destroyed
+                    logger.debug(f"Settle check failed: {e}")
+            await asyncio.sleep(POLL_MS / 1000)
+
+        return (time.perf_counter() - start) * 1000
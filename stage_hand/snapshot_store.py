@@ -1,24 +1,134 @@
 import json
-from dataclasses import asdict
+import sqlite3
+from dataclasses import asdict, fields
 from pathlib import Path
+from typing import Dict, Iterable, Optional
 from stage_hand.selector_snapshot import SelectorSnapshot
+from runner.json_file import write_json
 
 
 class SnapshotStore:
+    """
+    Snapshot cache backed by SQLite in WAL mode, keyed by step text plus
+    the fingerprint route of the screen it was recorded on, so the same
+    step text on two screens (e.g. `Select "365_Backup".` in a dropdown and
+    on a settings page) keeps one snapshot per screen. Snapshots recorded
+    without a fingerprint (keyboard presses, legacy entries) use route "".
+
+    Each put is a single-row upsert committed in its own transaction, so the
+    write cost stays flat as the cache grows and a crash never leaves a
+    half-written file behind. The legacy snapshots.json is imported on first
+    open and can be exported again with export_json().
+    """
     def __init__(self, path: str):
-        self.path = Path(path)
+        path = Path(path)
+        if path.suffix == ".json":
+            # Legacy callers pass the JSON file → keep the DB next to it
+            self.json_path = path
+            self.path = path.with_suffix(".db")
+        else:
+            self.json_path = path.with_suffix(".json")
+            self.path = path
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        self.data = self._load()
 
-    def _load(self):
-        if self.path.exists():
-            return json.loads(self.path.read_text())
-        return {}
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+        if len(self) == 0 and self.json_path.exists():
+            self.import_json(self.json_path)
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+
+    def _create_schema(self):
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(snapshots)")]
+        with self.conn:
+            if columns and "route" not in columns:
+                # Step-keyed table from before routes → re-key existing rows
+                self.conn.execute("ALTER TABLE snapshots RENAME TO snapshots_legacy")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " step TEXT NOT NULL,"
+                " route TEXT NOT NULL DEFAULT '',"
+                " data TEXT NOT NULL,"
+                " PRIMARY KEY (step, route))"
+            )
+            if columns and "route" not in columns:
+                rows = self.conn.execute("SELECT data FROM snapshots_legacy").fetchall()
+                self._upsert(self._from_dict(json.loads(data)) for (data,) in rows)
+                self.conn.execute("DROP TABLE snapshots_legacy")
 
-    def get(self, step: str) -> SelectorSnapshot | None:
-        raw = self.data.get(step)
-        return SelectorSnapshot(**raw) if raw else None
+    @staticmethod
+    def route_of(snapshot: SelectorSnapshot) -> str:
+        return (snapshot.fingerprint or {}).get("route") or ""
+
+    def get(self, step: str, route: Optional[str] = None) -> SelectorSnapshot | None:
+        """
+        Snapshot of `step` recorded on `route`, else its route-less one.
+        Without a route (screen unknown) any snapshot of the step is returned.
+        """
+        if route is None:
+            row = self.conn.execute(
+                "SELECT data FROM snapshots WHERE step = ? ORDER BY route = '' DESC LIMIT 1",
+                (step,),
+            ).fetchone()
+        else:
+            row = self.conn.execute(
+                "SELECT data FROM snapshots WHERE step = ? AND route IN (?, '') "
+                "ORDER BY route = '' LIMIT 1",
+                (step, route),
+            ).fetchone()
+        return self._from_dict(json.loads(row[0])) if row else None
+
+    def recorded_elsewhere(self, step: str, route: str) -> bool:
+        """True if `step` has snapshots recorded on routes other than `route`."""
+        row = self.conn.execute(
+            "SELECT 1 FROM snapshots WHERE step = ? AND route NOT IN (?, '') LIMIT 1",
+            (step, route),
+        ).fetchone()
+        return row is not None
 
     def put(self, snapshot: SelectorSnapshot):
-        self.data[snapshot.step] = asdict(snapshot)
-        self.path.write_text(json.dumps(self.data, indent=2))
+        self.put_many([snapshot])
+
+    def put_many(self, snapshots: Iterable[SelectorSnapshot]):
+        """Upsert several snapshots in one atomic transaction."""
+        with self.conn:
+            self._upsert(snapshots)
+
+    def _upsert(self, snapshots: Iterable[SelectorSnapshot]):
+        rows = [(s.step, self.route_of(s), json.dumps(asdict(s))) for s in snapshots]
+        self.conn.executemany(
+            "INSERT INTO snapshots (step, route, data) VALUES (?, ?, ?) "
+            "ON CONFLICT(step, route) DO UPDATE SET data = excluded.data",
+            rows,
+        )
+
+    def all(self) -> Dict[str, SelectorSnapshot]:
+        """All snapshots, keyed by step ("<route> | <step>" for routed ones)."""
+        rows = self.conn.execute("SELECT step, route, data FROM snapshots").fetchall()
+        return {
+            f"{route} | {step}" if route else step: self._from_dict(json.loads(data))
+            for step, route, data in rows
+        }
+
+    def import_json(self, path):
+        """Import a snapshots.json file ({step: snapshot_dict})."""
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+        self.put_many(self._from_dict(data) for data in raw.values())
+
+    def export_json(self, path=None):
+        """Write all snapshots as JSON (atomic replace of the target file)."""
+        path = Path(path) if path else self.json_path
+        write_json(path, {step: asdict(s) for step, s in self.all().items()})
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _from_dict(data: dict) -> SelectorSnapshot:
+        # Ignore unknown keys so older/newer payloads still load
+        names = {f.name for f in fields(SelectorSnapshot)}
+        return SelectorSnapshot(**{k: v for k, v in data.items() if k in names})
@@ -0,0 +1,52 @@
+"""
+Micro-benchmark for SnapshotStore put/get latency.
+
+Run from the repo root:
+    python -m stage_hand.snapshot_store_bench
+"""
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from stage_hand.selector_snapshot import SelectorSnapshot
+from stage_hand.snapshot_store import SnapshotStore
+
+SIZES = [100, 1_000, 10_000, 100_000]
+OPS = 1_000
+
+
+def _snapshot(i: int) -> SelectorSnapshot:
+    return SelectorSnapshot(
+        step=f'Type "value {i}" on the field {i}.',
+        selector=f"xpath=/html/body[1]/div[{i % 50}]/input[{i}]",
+        method="fill",
+        arguments=[f"value {i}"],
+        description=f"Field {i}",
+    )
+
+
+def run():
+    print(f"{'snapshots':>10} {'put µs/op':>10} {'get µs/op':>10}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SnapshotStore(str(Path(tmp) / "snapshots.db"))
+            store.put_many(_snapshot(i) for i in range(size))
+
+            start = time.perf_counter()
+            for i in range(OPS):
+                store.put(_snapshot(size + i))
+            put_us = (time.perf_counter() - start) / OPS * 1e6
+
+            keys = [_snapshot(random.randrange(size)).step for _ in range(OPS)]
+            start = time.perf_counter()
+            for key in keys:
+                store.get(key)
+            get_us = (time.perf_counter() - start) / OPS * 1e6
+
+            store.close()
+        print(f"{size:>10} {put_us:>10.1f} {get_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,24 +1,46 @@
-import asyncio
-from typing import List
+from typing import Callable, List, Set
 
+import asyncio
 import json
 import logging
-import time
-import re
 
 from parser.dsl_models import Step
-from stagehand import StagehandConfig, Stagehand
+from stage_hand.browser_pool import BrowserPool, BrowserLease
+from stage_hand.settle import SettleDetector, settle_bounds
 from stage_hand.result import TestResult, StepResult
 from stage_hand.two_pharse_engine import TwoPhaseEngine  # Fixed import to match file name
 from stage_hand.snapshot_store import SnapshotStore
-from config.config import api_key
+from stage_hand.wait_engine import execute_wait_step
+from stage_hand.step_compiler import compile_step, run_compiled
+from stage_hand.prefetch import ObservePrefetcher
+from stage_hand.page_fingerprint import page_fingerprint
+from runner.deadline import DeadlineExceeded, current_deadline, remaining_timeout
 
 
 logger = logging.getLogger(__name__)
 
+def _load_data_vars() -> dict:
+    with open("./storage/data.json", encoding="utf-8") as f:
+        return json.load(f)
+
+async def warm_up(pool: BrowserPool) -> BrowserLease:
+    """
+    Lease a browser with the app URL already loaded, ahead of the UI steps.
+    Hand the lease to process(); the caller must release it if process() is never run.
+    """
+    return await pool.acquire(_load_data_vars()["url"])
+
 async def process(
     steps: List[Step],
     mode: str = "ai",
+    pool: BrowserPool = None,
+    max_wait: float = 60,
+    poll_interval: float = 3,
+    lookahead: int = 0,
+    batch_observe: bool = True,
+    lease: BrowserLease = None,
+    skip_steps: Set[int] = None,
+    on_step_passed: Callable[[int], None] = None,
 ) -> TestResult:
     logger.info("🚀 Start Stagehand execution")
 
@@ -27,59 +49,111 @@ async def process(
     failed_step = None
     step_results: List[StepResult] = []
 
-    stagehand = None
+    # Standalone call → one-shot pool closed at the end
+    own_pool = pool is None
+    if own_pool:
+        pool = BrowserPool(size=1)
+    engine = None
+    setup_time = None
 
     try:
         # ─────────── SETUP ───────────
-        with open("./storage/data.json", encoding="utf-8") as f:
-            data_vars = json.load(f)
-         # Init Stagehand
-        config = StagehandConfig(
-            env="LOCAL",
-            model_name="google/gemini-2.5-flash",
-            model_api_key=api_key,
-            ignore_https_errors=True,
-            verbose=2
-        )
+        # A lease warmed up by warm_up() skips browser start and navigation
+        if lease is None:
+            lease = await pool.acquire(_load_data_vars()["url"])
+        stagehand = lease.stagehand
+        page = lease.page
+        setup_time = lease.setup_time
+        print(f"Browser setup: {setup_time:.2f}s")
 
-        stagehand = Stagehand(config)
-        await stagehand.init()
-
-        page = stagehand.page
-        await page.set_viewport_size({"width": 1280, "height": 980})
-        await page.goto(data_vars["url"])
+        settle = SettleDetector()
+        await settle.attach(page)
 
         print("Loading snapshots...")
 
-        snapshot_store = SnapshotStore("./storage/snapshots.json")
+        snapshot_store = SnapshotStore("./storage/snapshots.db")
         engine = TwoPhaseEngine(snapshot_store)
+        if lookahead > 0:
+            engine.prefetcher = ObservePrefetcher(lookahead)
 
         print("Snapshots loaded.")
 
+        # Steps sharing a screen are resolved with one batched observe; which
+        # of them still need an observe is decided when the group's screen is up
+        texts = [s.text for s in steps]
+        skip_steps = skip_steps or set()
+        groups = {}
+        if batch_observe:
+            groups = {
+                group[0]: group for group in TwoPhaseEngine.batch_groups(texts)
+                if len(group) >= 2
+            }
+        batched = {i for group in groups.values() for i in group}
+
         # ─────────── RUN (STAGEHAND ONLY) ───────────
         for idx, step in enumerate(steps, start=1):
             logger.info(f"[{idx}] {step.text}")
             print(f"Processing step {idx}: {step.text}")
 
+            # Resumed run: already-passed [skippable] step
+            if idx in skip_steps:
+                print(f"⏭️  Skipping step {idx} (passed before resume)")
+                step_results.append(StepResult(step=idx, instruction=step.text, status="SKIPPED"))
+                continue
+
             try:
                 # instruction = _resolve_placeholders(step.text, data_vars)
 
-                result = await _execute_single_step(
-                    idx,
-                    step.text,
-                    page,
-                    stagehand,
-                    engine,
-                    # step,          # pass Step object (important)
-                )
-
-                step_results.append(result)
-                print(f"Step result: {result}")
+                route = None
+                if idx - 1 in groups or engine.prefetcher:
+                    fingerprint = await page_fingerprint(page)
+                    route = fingerprint.route if fingerprint else None
+
+                if idx - 1 in groups:
+                    pending = [
+                        i for i in groups[idx - 1]
+                        if i + 1 not in skip_steps and _is_prefetchable(texts[i], engine, route)
+                    ]
+                    if len(pending) >= 2:
+                        await engine.observe_batch(page, [texts[i] for i in pending])
+
+                # Speculatively observe the next step(s) while this one runs
+                if engine.prefetcher:
+                    for i in range(idx, min(idx + lookahead, len(steps))):
+                        if i not in batched and i + 1 not in skip_steps and _is_prefetchable(texts[i], engine, route):
+                            engine.prefetcher.schedule(page, texts[i])
+
+                # Bounded by the testcase / suite deadline; an overrun fails this step
+                where = f"step {idx}: {step.text}"
+                try:
+                    result = await asyncio.wait_for(
+                        _execute_single_step(
+                            idx,
+                            step.text,
+                            page,
+                            stagehand,
+                            engine,
+                            # step,          # pass Step object (important)
+                            max_wait=max_wait,
+                            poll_interval=poll_interval,
+                        ),
+                        timeout=remaining_timeout(None, where),
+                    )
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded(current_deadline().label, where)
 
                 if result.status == "FAILED":
                     raise RuntimeError(result.error)
-                # Small delay between actions
-                await asyncio.sleep(2)
+
+                # Wait for the UI to settle instead of a fixed delay
+                min_ms, max_ms = settle_bounds(step.text)
+                result.settle_ms = await settle.wait(min_ms, max_ms)
+                print(f"Settled in {result.settle_ms:.0f}ms")
+
+                step_results.append(result)
+                print(f"Step result: {result}")
+                if on_step_passed:
+                    on_step_passed(idx)
 
             except Exception as e:
                 test_failed = True
@@ -99,44 +173,91 @@ async def process(
                 logger.error("❌ Stop Stagehand execution on failure")
                 break
 
-    finally:
-        if stagehand:
-            await stagehand.close()
+        print(f"Snapshot cache: {engine.stats}")
+        if engine.prefetcher:
+            print(f"Observe prefetch: {engine.prefetcher.stats}")
+        slowest = max(step_results, key=lambda r: r.settle_ms or 0, default=None)
+        if slowest and slowest.settle_ms:
+            settle_total = sum(r.settle_ms or 0 for r in step_results)
+            print(f"UI settle: {settle_total / 1000:.1f}s total, slowest step {slowest.step} ({slowest.settle_ms:.0f}ms)")
 
-    return TestResult(
+    finally:
+        if engine and engine.prefetcher:
+            engine.prefetcher.cancel_all()
+        if engine:
+            engine.store.close()
+        if lease:
+            await pool.release(lease)
+        if own_pool:
+            await pool.close()
+
+    test_result = TestResult(
         passed=not test_failed,
         failed_step=failed_step,
         reason=failure_reason,
         steps=step_results,
+        setup_time=setup_time,
     )
+    llm_free, done = test_result.llm_free_counts
+    print(f"LLM-free steps: {llm_free}/{done} passed ({test_result.llm_free_ratio:.0%})")
+    return test_result
+
+def _is_prefetchable(instruction: str, engine, route: str = None) -> bool:
+    """
+    Only steps that would end in an LLM observe are worth prefetching; a
+    snapshot counts only if act() would find it on `route` (the current screen).
+    """
+    lowered = instruction.lower()
+    if instruction.startswith("@") or lowered.startswith(("wait", "press")):
+        return False
+    if compile_step(instruction) or engine.store.get(instruction, route):
+        return False
+    return True
 
 async def _execute_single_step(
     step_no: int,
     instruction: str,
     page,
     stagehand,
-    engine
+    engine,
+    max_wait: float = 60,
+    poll_interval: float = 3,
 ) -> StepResult:
 
     try:
         result = None
+        stats_before = dict(engine.stats)
         # Determine action type based on instruction
         is_click_action = instruction.lower().startswith('click') or 'click' in instruction.lower()
         is_expect_action = instruction.lower().startswith('expect')
         is_wait_action = instruction.lower().startswith('wait')
         is_press_action = instruction.lower().startswith('press') or 'press' in instruction.lower()
 
-        if is_click_action: 
-            result = await engine.act(stagehand, page, instruction)
-        elif is_expect_action:
-            result = await engine.observe(page, instruction)
-        elif is_press_action:
-            result = await engine.press(stagehand, page, instruction)
-        elif is_wait_action:
-            result = await execute_wait_step(page, instruction)
-        else:
-            result = await engine.act(stagehand, page, instruction)
-        print(f"instruction:", instruction)
+        # Deterministic fast path (no model call), engine as fallback
+        compiled = compile_step(instruction)
+        if compiled:
+            try:
+                result = await run_compiled(page, compiled)
+                print(f"Fast path: {compiled}")
+            except Exception as e:
+                logger.info(f"Fast path missed for '{instruction}': {e}")
+                result = None
+
+        if result is None:
+            if is_click_action:
+                result = await engine.act(stagehand, page, instruction)
+            elif is_expect_action:
+                result = await engine.observe(page, instruction)
+            elif is_press_action:
+                result = await engine.press(stagehand, page, instruction)
+            elif is_wait_action:
+                result = await execute_wait_step(
+                    page, instruction, engine,
+                    max_wait_min=max_wait,
+                    poll_interval_min=poll_interval,
+                )
+            else:
+                result = await engine.act(stagehand, page, instruction)
         print(f"Engine act result: {result}")
 
         if hasattr(result, "success") and not result.success:
@@ -145,114 +266,14 @@ async def _execute_single_step(
         return StepResult(
             step=step_no,
             instruction=instruction,
-            status="PASSED"
+            status="PASSED",
+            used_agent=bool(getattr(result, "used_agent", False)),
+            used_llm=getattr(result, "used_llm", True),
+            cache_hits=engine.stats["hit"] - stats_before["hit"],
+            cache_misses=engine.stats["miss"] - stats_before["miss"],
+            cache_drifts=engine.stats["drift"] - stats_before["drift"],
         )
 
     except Exception as primary_error:
         logger.warning(f"Primary action failed: {primary_error}")
         raise RuntimeError(f"Step failed after agent fallback: {primary_error}")
-    
-def parse_wait_condition(step: str) -> dict:
-    match = re.search(r'not\s+"([^"]+)"', step, re.IGNORECASE)
-    return {
-        "forbiddenValue": match.group(1) if match else "Running"
-    }
-
-async def execute_wait_step(page, step: str):
-    condition = parse_wait_condition(step)
-    forbidden_value = condition["forbiddenValue"]
-
-    # Treat @max_wait and @poll_interval as minutes
-    # cfg = self.test_case.config or {}
-    # max_wait_min = int(cfg.get("max_wait", 60))  # default 60 minutes
-    # poll_interval_min = float(cfg.get("poll_interval", 3))  # default 3 minutes
-    max_wait_min = 60  # default 60 minutes
-    poll_interval_min = 3  # default 3 minutes
-
-    timeout_ms = int(max_wait_min * 60 * 1000)  # minutes -> ms
-    interval_ms = int(poll_interval_min * 60 * 1000)  # minutes -> ms
-
-    start = time.time()
-    last_status = None
-
-    while (time.time() - start) * 1000 < timeout_ms:
-        try:
-            result = await page.observe(step)
-        except Exception as e:
-            logger.debug(f"observe failed: {e}; retrying...")
-            await asyncio.sleep(interval_ms / 1000)
-            continue
-
-        if result is None or (isinstance(result, list) and len(result) == 0):
-            logger.debug("No status element found, retrying...")
-            await asyncio.sleep(interval_ms / 1000)
-            continue
-
-        # Extract status text from observe result (robust)
-        status_text = await extract_status_text(page, result)
-        if not status_text:
-            logger.debug("Could not extract status text, retrying...")
-            await asyncio.sleep(interval_ms / 1000)
-            continue
-        
-        last_status = status_text
-        logger.debug(f"Current status: {status_text}")
-        
-        # Check if status contains the forbidden value (e.g., "Running")
-        is_still_forbidden = forbidden_value in status_text
-        
-        if not is_still_forbidden:
-            # Status has changed from "Running" to something else (Success/Failed)
-            logger.info(f"✓ Wait condition met. Status changed to: {status_text}")
-            return
-
-        # Status is still "Running", continue waiting
-        logger.info(f"⏳ Still waiting... Current status: {status_text}")
-        await asyncio.sleep(interval_ms / 1000)
-
-    raise TimeoutError(
-        f"Timeout waiting for backup job. Last status: {last_status}"
-    )
-
-async def extract_status_text(page, result):
-    """Robustly extract visible status text from observe results.
-    - Supports list/dict/single result
-    - Tries direct text fields first, then uses selector to read inner text
-    """
-    if result is None:
-        return None
-
-    # Normalize to a list of items to inspect
-    items = []
-    if isinstance(result, dict) and 'elements' in result:
-        items = result.get('elements') or []
-    elif isinstance(result, list):
-        items = result
-    else:
-        items = [result]
-
-    # First pass: use any direct text fields provided by Stagehand
-    for item in items:
-        text = getattr(item, 'text', None) or getattr(item, 'statusText', None)
-        if isinstance(text, str) and text.strip():
-            return text.strip()
-
-    # Second pass: if a selector is available, read the element text now (avoids stale node ids)
-    for item in items:
-        selector = getattr(item, 'selector', None)
-        if not selector:
-            continue
-        try:
-            elem = await page.query_selector(selector)
-            if elem:
-                text = await elem.inner_text()
-                if text and text.strip():
-                    return text.strip()
-        except Exception as e:
-            logger.debug(f"extract_status_text: failed to read selector '{selector}': {e}")
-            continue
-    return None
-
-
-
-
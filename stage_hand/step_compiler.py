@@ -0,0 +1,153 @@
+import logging
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from stage_hand.result import EngineActResult
+
+logger = logging.getLogger(__name__)
+
+ACTION_TIMEOUT_MS = 5000
+MAX_VISIBLE_CHECK = 5
+
+ROLES = {
+    "button": "button",
+    "link": "link",
+    "tab": "tab",
+    "checkbox": "checkbox",
+    "menu": "menuitem",
+    "menu item": "menuitem",
+}
+
+_TYPE_RE = re.compile(
+    r'^type\s+"(?P<value>[^"]*)"\s+(?:on|in|into)\s+(?:the\s+)?'
+    r'(?P<target>.+?)(?:\s+(?:input|field|textbox|box))?\.?$',
+    re.IGNORECASE,
+)
+_CLICK_QUOTED_RE = re.compile(
+    r'^click\s+(?:on\s+)?(?:the\s+)?"(?P<target>[^"]+)"'
+    r'(?:\s+(?P<role>button|link|tab|checkbox|menu item|menu))?\.?$',
+    re.IGNORECASE,
+)
+_CLICK_BARE_RE = re.compile(
+    r'^click\s+(?:on\s+)?(?:the\s+)?(?P<target>[A-Za-z0-9&]+(?:\s+[A-Za-z0-9&]+){0,2}?)'
+    r'(?:\s+(?P<role>button|link|tab|checkbox|menu))?\.?$',
+    re.IGNORECASE,
+)
+_EXPECT_RE = re.compile(
+    r'^expect\s+"(?P<target>[^"]+)"\s+to\s+be\s+visible\.?$',
+    re.IGNORECASE,
+)
+_PRESS_RE = re.compile(
+    r'^press\s+(?:the\s+)?(?P<key>[A-Za-z0-9+]+)(?:\s+key)?\.?$',
+    re.IGNORECASE,
+)
+
+
+class FastPathMiss(Exception):
+    """The compiled step could not be resolved locally → use the engine."""
+
+
+@dataclass
+class CompiledStep:
+    action: str                    # fill | click | expect_visible | press
+    target: Optional[str] = None   # label / accessible name / text
+    value: Optional[str] = None    # fill value or key
+    role: Optional[str] = None     # ARIA role hint for click
+
+
+def compile_step(instruction: str) -> Optional[CompiledStep]:
+    """Parse a DSL step into a typed action, or None if it is not recognized."""
+    text = instruction.strip()
+    if text.startswith("@") or text.startswith("["):
+        return None
+
+    m = _TYPE_RE.match(text)
+    if m:
+        return CompiledStep("fill", target=m["target"].strip('"'), value=m["value"])
+
+    m = _CLICK_QUOTED_RE.match(text)
+    if m:
+        role = ROLES.get((m["role"] or "").lower())
+        return CompiledStep("click", target=m["target"], role=role)
+
+    m = _CLICK_BARE_RE.match(text)
+    if m:
+        role = ROLES.get((m["role"] or "").lower())
+        return CompiledStep("click", target=m["target"], role=role)
+
+    m = _EXPECT_RE.match(text)
+    if m:
+        return CompiledStep("expect_visible", target=m["target"])
+
+    m = _PRESS_RE.match(text)
+    if m:
+        return CompiledStep("press", value=m["key"])
+
+    return None
+
+
+async def run_compiled(page, compiled: CompiledStep) -> EngineActResult:
+    """
+    Execute a compiled step with Playwright locators only (no model call).
+    Raises FastPathMiss when the target cannot be resolved unambiguously.
+    """
+    if compiled.action == "press":
+        await page.keyboard.press(compiled.value)
+
+    elif compiled.action == "fill":
+        locator = await _first_unique(page, _fill_candidates(page, compiled.target))
+        await locator.fill(compiled.value, timeout=ACTION_TIMEOUT_MS)
+
+    elif compiled.action == "click":
+        locator = await _first_unique(page, _click_candidates(page, compiled))
+        await locator.click(timeout=ACTION_TIMEOUT_MS)
+
+    elif compiled.action == "expect_visible":
+        if not await _any_visible(page.get_by_text(compiled.target, exact=True)):
+            raise FastPathMiss(f'"{compiled.target}" not visible')
+
+    else:
+        raise FastPathMiss(f"Unsupported compiled action: {compiled.action}")
+
+    return EngineActResult(
+        success=True,
+        used_agent=False,
+        raw=compiled,
+        used_llm=False
+    )
+
+
+def _fill_candidates(page, target: str):
+    yield page.get_by_label(target)
+    yield page.get_by_placeholder(target)
+    yield page.get_by_role("textbox", name=target)
+    if "password" in target.lower():
+        yield page.locator("input[type=password]")
+
+
+def _click_candidates(page, compiled: CompiledStep):
+    # Role hint first, then the usual clickable roles, then plain text
+    roles = [compiled.role] if compiled.role else []
+    roles += [r for r in ("button", "link") if r not in roles]
+    for role in roles:
+        yield page.get_by_role(role, name=compiled.target, exact=True)
+    yield page.get_by_text(compiled.target, exact=True)
+
+
+async def _first_unique(page, candidates):
+    for locator in candidates:
+        try:
+            if await locator.count() == 1 and await locator.is_visible():
+                return locator
+        except Exception as e:
+            logger.debug(f"Fast-path locator failed: {e}")
+    raise FastPathMiss("No unique visible element")
+
+
+async def _any_visible(locator) -> bool:
+    count = await locator.count()
+    for i in range(min(count, MAX_VISIBLE_CHECK)):
+        if await locator.nth(i).is_visible():
+            return True
+    return False
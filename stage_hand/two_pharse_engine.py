@@ -1,17 +1,50 @@
 from stage_hand.result import EngineActResult
 from stage_hand.snapshot_store import SnapshotStore
 from stage_hand.selector_snapshot import SelectorSnapshot
+from stage_hand.locator_candidates import collect_candidates, to_locator, rerank
+from stage_hand.page_fingerprint import PageFingerprint, page_fingerprint
 from stagehand import  ObserveResult
 from config.config import api_key
 
+import re
 import string
 import logging
+from dataclasses import asdict
+from typing import Dict, List
 
 logger = logging.getLogger(__name__)
 
+# Playwright locator methods used to replay a recorded observe method
+REPLAY_METHODS = {
+    "click": "click",
+    "fill": "fill",
+    "type": "fill",
+    "press": "press",
+    "selectOptionFromDropdown": "select_option",
+}
+REPLAY_TIMEOUT_MS = 5000
+
+# Steps starting with these verbs usually change the screen → end a batch
+NAVIGATION_VERBS = ("click", "open", "select", "submit", "run", "ensure")
+# Steps that can share a batched observe with their neighbours
+BATCHABLE_VERBS = NAVIGATION_VERBS + ("type", "fill", "enter", "expect", "verify", "check")
+
+
 class TwoPhaseEngine:
     def __init__(self, store: SnapshotStore):
         self.store = store
+        # Snapshot cache counters for the whole run (hit | miss | drift)
+        self.stats = {"hit": 0, "miss": 0, "drift": 0}
+        # Optional ObservePrefetcher (lookahead mode)
+        self.prefetcher = None
+
+    async def _observe(self, page, step: str):
+        """page.observe, served from the prefetcher when still valid."""
+        if self.prefetcher:
+            result = await self.prefetcher.take(page, step)
+            if result:
+                return result
+        return await page.observe(step)
 
     async def press(self, stagehand, page, step: str):
         # For simplicity, assume step is something like "Press Enter"
@@ -35,22 +68,37 @@ class TwoPhaseEngine:
         return EngineActResult(
             success=True,
             used_agent=False,
-            raw=key
+            raw=key,
+            used_llm=False
         )
 
 
     async def act(self, stagehand, page, step: str):
         # 1️⃣ Replay (no LLM)
-        snapshot = self.store.get(step)
-        # if snapshot:
-        #     try:
-        #         await self.replay_snapshot(page, snapshot)
-        #         return "replay"
-        #     except Exception:
-        #         pass  # selector drift → heal
+        fingerprint = await page_fingerprint(page)
+        snapshot, cache = self.lookup(step, fingerprint)
+        match = self.fingerprint_match(snapshot, fingerprint) if snapshot else None
+        if snapshot:
+            try:
+                # exact match → trusted replay, near match → validated replay
+                await self.replay_snapshot(page, snapshot, trusted=match == "exact")
+                self.stats["hit"] += 1
+                print(f"Replayed snapshot for step: {step}")
+                return EngineActResult(
+                    success=True,
+                    used_agent=False,
+                    raw=snapshot,
+                    cache="hit",
+                    used_llm=False
+                )
+            except Exception as e:
+                # selector drift → heal via observe / agent
+                logger.info(f"Snapshot drift for step '{step}': {e}")
+                cache = "drift"
+        self.stats[cache] += 1
 
         # 2️⃣ Observe (LLM)
-        result: ObserveResult = await page.observe(step)
+        result: ObserveResult = await self._observe(page, step)
         print(f"ObserveResult: {result}")
         if not result or step.startswith("@execute"):
             agent_act_result = await self.agent_act(page, step, stagehand)
@@ -59,7 +107,8 @@ class TwoPhaseEngine:
                     success=False,
                     used_agent=True,
                     error="Agent recovery failed",
-                    raw=agent_act_result
+                    raw=agent_act_result,
+                    cache=cache
                 )
              # `used_agent` contains the actions log
             agent_actions = agent_act_result.used_agent
@@ -76,17 +125,21 @@ class TwoPhaseEngine:
                 selector=None,
                 method='click',
                 arguments=[click_action['x'], click_action['y']],
-                description="Recovered by agent_act"
+                description="Recovered by agent_act",
+                fingerprint=asdict(fingerprint) if fingerprint else None
             )
             self.store.put(snapshot)
             return EngineActResult(
                 success=True,
                 used_agent=True,
-                raw=agent_act_result
+                raw=agent_act_result,
+                cache=cache
             )
 
         # 3️⃣ Snapshot
         snapshot = self.snapshot_from_observe(step, result)
+        snapshot.candidates = await collect_candidates(page, snapshot.selector)
+        snapshot.fingerprint = asdict(fingerprint) if fingerprint else None
         print(f"Snapshot: {snapshot}")
         self.store.put(snapshot)
 
@@ -101,7 +154,8 @@ class TwoPhaseEngine:
         return EngineActResult(
             success=True,
             used_agent=False,
-            raw=result
+            raw=result,
+            cache=cache
         )
 
     async def observe(self, page, step: str):
@@ -112,45 +166,247 @@ class TwoPhaseEngine:
         - or SelectorSnapshot (cached, no AI)
         """
 
-        # # 1️⃣ Replay observe (NO AI)
-        # snapshot = self.store.get(step)
-        # if snapshot:
-        #     el = await page.query_selector(snapshot.selector)
-        #     if el:
-        #         return snapshot, "replay"
+        # 1️⃣ Replay observe (NO AI)
+        fingerprint = await page_fingerprint(page)
+        snapshot, cache = self.lookup(step, fingerprint)
+        if snapshot and snapshot.selector:
+            try:
+                locator = await self.resolve_snapshot(page, snapshot)
+                await self.check_expected_text(locator, step)
+                self.stats["hit"] += 1
+                return EngineActResult(
+                    success=True,
+                    used_agent=False,
+                    raw=snapshot,
+                    cache="hit",
+                    used_llm=False
+                )
+            except Exception as e:
+                logger.info(f"Snapshot drift for step '{step}': {e}")
+                cache = "drift"
+        self.stats[cache] += 1
 
         # 2️⃣ Fresh observe (AI)
         try:
-            raw_result = await page.observe(step)
+            raw_result = await self._observe(page, step)
             observe_result = self.normalize_observe_result(raw_result, step)
 
             snapshot = self.snapshot_from_observe(step, observe_result)
+            snapshot.candidates = await collect_candidates(page, snapshot.selector)
+            snapshot.fingerprint = asdict(fingerprint) if fingerprint else None
             self.store.put(snapshot)
             return EngineActResult(
                 success=True,
                 used_agent=True,
-                raw=observe_result
+                raw=observe_result,
+                cache=cache
             )
         except Exception as e:
              return EngineActResult(
                 success=False,
                 used_agent=True,
-                error=str(e)
+                error=str(e),
+                cache=cache
+            )
+
+    @staticmethod
+    def expected_literal(step: str):
+        """Quoted literal an expect/verify step asserts, e.g. "Completed"."""
+        if not step.strip().lower().startswith(("expect", "verify")):
+            return None
+        match = re.search(r'"([^"]+)"', step)
+        return match.group(1) if match else None
+
+    async def check_expected_text(self, locator, step: str):
+        """
+        A cached element only proves the element exists; for assertions the
+        expected literal must also be in its text (else → fresh observe).
+        """
+        expected = self.expected_literal(step)
+        if not expected:
+            return
+        text = await locator.inner_text(timeout=REPLAY_TIMEOUT_MS)
+        if expected not in (text or ""):
+            raise RuntimeError(
+                f"Cached element text '{(text or '').strip()[:80]}' does not contain '{expected}'"
+            )
+
+    async def resolve_single_visible(self, page, selector: str):
+        """
+        Cheap validation of a cached selector: it must resolve to exactly
+        one visible element. Returns the Playwright locator.
+        """
+        return await self._single_visible(page.locator(selector), selector)
+
+    async def _single_visible(self, locator, label: str):
+        count = await locator.count()
+        if count != 1:
+            raise RuntimeError(
+                f"Replay failed – selector matched {count} elements: {label}"
             )
-    async def replay_snapshot(self, page, snapshot: SelectorSnapshot):
-        el = await page.query_selector(snapshot.selector)
-        if not el:
+        if not await locator.is_visible():
             raise RuntimeError(
-                f"Replay failed – selector not found: {snapshot.selector}"
+                f"Replay failed – element not visible: {label}"
             )
+        return locator
+
+    async def resolve_snapshot(self, page, snapshot: SelectorSnapshot):
+        """
+        Try the snapshot's ranked locator candidates locally, in order.
+        The one that resolves is promoted and the failed ones demoted;
+        raises only when every candidate failed.
+        """
+        if not snapshot.candidates:
+            return await self.resolve_single_visible(page, snapshot.selector)
+
+        failed = []
+        for candidate in snapshot.candidates:
+            try:
+                locator = await self._single_visible(
+                    to_locator(page, candidate), f"{candidate['kind']}={candidate['value']}"
+                )
+            except Exception as e:
+                logger.debug(f"Locator candidate failed: {e}")
+                failed.append(candidate)
+                continue
+
+            if failed:
+                snapshot.candidates = rerank(snapshot.candidates, candidate, failed)
+                self.store.put(snapshot)
+            return locator
+
+        raise RuntimeError(f"Replay failed – all {len(failed)} locator candidates failed")
 
+    def lookup(self, step: str, fingerprint: PageFingerprint):
+        """
+        (snapshot for this screen's route, cache outcome if it cannot be used).
+        A step recorded only on other routes counts as "drift", not "miss".
+        """
+        route = fingerprint.route if fingerprint else None
+        snapshot = self.store.get(step, route)
+        if snapshot is None and route is not None and self.store.recorded_elsewhere(step, route):
+            # Recorded on another screen → straight to observe
+            logger.info(f"Snapshot fingerprint mismatch for step '{step}'")
+            return None, "drift"
+        return snapshot, "miss"
+
+    @staticmethod
+    def fingerprint_match(snapshot: SelectorSnapshot, current: PageFingerprint) -> str:
+        """exact | near | mismatch; untagged snapshots count as near (validate)."""
+        if not snapshot.fingerprint or current is None:
+            return "near"
+        return PageFingerprint(**snapshot.fingerprint).compare(current)
+
+    async def replay_snapshot(self, page, snapshot: SelectorSnapshot, trusted: bool = False):
         method = snapshot.method
-        args = snapshot.arguments
+        args = snapshot.arguments or []
+
+        # Keyboard snapshot (recorded by press)
+        if not snapshot.selector and method == "press":
+            await page.keyboard.press(*args)
+            return
+
+        # Coordinate snapshot (recorded by agent_act)
+        if not snapshot.selector:
+            if len(args) < 2:
+                raise RuntimeError(f"Replay failed – no selector or coordinates for: {snapshot.step}")
+            x, y = args[0], args[1]
+            has_target = await page.evaluate(
+                "([x, y]) => !!document.elementFromPoint(x, y)", [x, y]
+            )
+            if not has_target:
+                raise RuntimeError(f"Replay failed – nothing at coordinates ({x}, {y})")
+            await page.mouse.click(x, y)
+            return
+
+        if trusted:
+            # Same screen as when recorded → skip the count/visibility checks
+            top = snapshot.candidates[0] if snapshot.candidates else None
+            locator = to_locator(page, top) if top else page.locator(snapshot.selector)
+        else:
+            locator = await self.resolve_snapshot(page, snapshot)
 
-        if not hasattr(el, method):
+        playwright_method = REPLAY_METHODS.get(method)
+        if not playwright_method:
             raise RuntimeError(f"Unsupported method: {method}")
 
-        await getattr(el, method)(*args)
+        await getattr(locator, playwright_method)(*args, timeout=REPLAY_TIMEOUT_MS)
+
+    @staticmethod
+    def batch_groups(steps: List[str]) -> List[List[int]]:
+        """
+        Split step indexes into groups that act on the same screen: runs of
+        batchable steps, each closed by the first navigation-causing step.
+        """
+        groups, current = [], []
+        for i, step in enumerate(steps):
+            verb = step.strip().split(" ", 1)[0].lower()
+            if step.startswith("@") or verb not in BATCHABLE_VERBS:
+                if current:
+                    groups.append(current)
+                current = []
+                continue
+            current.append(i)
+            if verb in NAVIGATION_VERBS:
+                groups.append(current)
+                current = []
+        if current:
+            groups.append(current)
+        return groups
+
+    async def observe_batch(self, page, steps: List[str]) -> Dict[str, SelectorSnapshot]:
+        """
+        Resolve several steps with ONE observe call (one DOM snapshot, one
+        LLM round trip) and store all resulting snapshots in one transaction.
+        Steps the model did not answer (or answered without their [n]
+        number) are simply left uncached.
+        """
+        numbered = "\n".join(f"{i}. {step}" for i, step in enumerate(steps, start=1))
+        instruction = (
+            "Find the target element for EACH of the following numbered UI actions "
+            "on the current page. Return exactly one element per action, in the same "
+            "order, and start each element description with the action number in "
+            "square brackets, e.g. \"[2] Password input\".\n"
+            f"{numbered}"
+        )
+        try:
+            results = await page.observe(instruction)
+        except Exception as e:
+            logger.warning(f"Batched observe failed: {e}")
+            return {}
+        results = results if isinstance(results, list) else [results] if results else []
+        fingerprint = await page_fingerprint(page)
+
+        by_index: Dict[int, ObserveResult] = {}
+        for result in results:
+            match = re.match(r"\s*\[(\d+)\]\s*", result.description or "")
+            if match:
+                by_index.setdefault(int(match.group(1)) - 1, result)
+        # Unnumbered results are not mapped by position: a wrong guess would
+        # be cached with this screen's fingerprint and replayed unchecked
+
+        # Route only (no title/landmarks): a batched mapping is a guess from one
+        # LLM call, so it must replay as "near" (validated), never "exact"
+        route_only = {"route": fingerprint.route, "title": "", "landmarks": ""} if fingerprint else None
+
+        snapshots = {}
+        for i, result in by_index.items():
+            if not 0 <= i < len(steps) or not result.selector:
+                continue
+            step = steps[i]
+            snapshots[step] = SelectorSnapshot(
+                step=step,
+                selector=result.selector,
+                method=result.method or "observe",
+                arguments=result.arguments or [],
+                description=re.sub(r"^\s*\[\d+\]\s*", "", result.description or ""),
+                candidates=await collect_candidates(page, result.selector),
+                fingerprint=route_only,
+            )
+
+        self.store.put_many(snapshots.values())
+        print(f"Batched observe resolved {len(snapshots)}/{len(steps)} steps in one call")
+        return snapshots
 
     def snapshot_from_observe(self, step: str, result: ObserveResult) -> SelectorSnapshot:
         result = self.normalize_observe_result(result, step)
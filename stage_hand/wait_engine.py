@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import re
+import time
+from dataclasses import asdict
+
+from stage_hand.result import EngineActResult
+from stage_hand.selector_snapshot import SelectorSnapshot
+from stage_hand.page_fingerprint import page_fingerprint
+from runner.deadline import DeadlineExceeded, current_deadline, remaining_timeout
+
+logger = logging.getLogger(__name__)
+
+# Resolves true as soon as a DOM mutation makes the status element disappear
+# or drop the forbidden value, or false after timeoutMs (fallback re-check).
+_STATUS_CHANGED_JS = """
+([selector, forbidden, timeoutMs]) => new Promise((resolve) => {
+  const changed = () => {
+    let el;
+    if (selector.startsWith('xpath=')) {
+      el = document.evaluate(selector.slice(6), document, null,
+        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    } else {
+      el = document.querySelector(selector);
+    }
+    return !el || !(el.innerText || el.textContent || '').includes(forbidden);
+  };
+  if (changed()) return resolve(true);
+
+  let timer;
+  const observer = new MutationObserver(() => { if (changed()) done(true); });
+  const done = (value) => {
+    observer.disconnect();
+    clearTimeout(timer);
+    resolve(value);
+  };
+  timer = setTimeout(() => done(false), timeoutMs);
+  observer.observe(document.documentElement || document, {
+    subtree: true, childList: true, characterData: true, attributes: true,
+  });
+})
+"""
+
+
+def parse_wait_condition(step: str) -> dict:
+    match = re.search(r'not\s+"([^"]+)"', step, re.IGNORECASE)
+    return {
+        "forbiddenValue": match.group(1) if match else "Running"
+    }
+
+
+async def execute_wait_step(
+    page,
+    step: str,
+    engine,
+    max_wait_min: float = 60,
+    poll_interval_min: float = 3,
+) -> EngineActResult:
+    """
+    Wait until the status element no longer shows the forbidden value.
+
+    The status element is resolved once (cached snapshot, else one LLM
+    observe) and then watched by a MutationObserver injected into the page,
+    so status changes are pushed as they happen.
+    The LLM is only consulted again if the element disappears.
+    @max_wait / @poll_interval are in minutes; the poll interval is only the
+    fallback re-check period between push events.
+    """
+    condition = parse_wait_condition(step)
+    forbidden_value = condition["forbiddenValue"]
+
+    # @max_wait, capped by what is left of the testcase / suite budget
+    timeout_s = remaining_timeout(max_wait_min * 60, step)
+    interval_s = poll_interval_min * 60
+
+    start = time.time()
+    last_status = None
+    selector = None
+    cache = None
+    observe_calls = 0
+
+    fingerprint = await page_fingerprint(page)
+    snapshot = engine.store.get(step, fingerprint.route if fingerprint else None)
+    if snapshot and snapshot.selector:
+        selector = snapshot.selector
+
+    while time.time() - start < timeout_s:
+        remaining_s = timeout_s - (time.time() - start)
+
+        # 1️⃣ Resolve the status element (LLM only on miss / disappearance)
+        status_text = await _read_text(page, selector) if selector else None
+        if status_text is None:
+            if cache is None:
+                cache = "drift" if selector else "miss"
+                engine.stats[cache] += 1
+            elif selector:
+                logger.info("Status element disappeared, re-observing...")
+            selector, status_text = await _observe_status(page, step, engine, fingerprint)
+            observe_calls += 1
+            if not selector or not status_text:
+                logger.debug("No status element found, retrying...")
+                await asyncio.sleep(min(interval_s, remaining_s))
+                continue
+        elif cache is None:
+            cache = "hit"
+            engine.stats["hit"] += 1
+
+        last_status = status_text
+        logger.debug(f"Current status: {status_text}")
+
+        # Check if status contains the forbidden value (e.g., "Running")
+        if forbidden_value not in status_text:
+            logger.info(f"✓ Wait condition met. Status changed to: {status_text}")
+            return EngineActResult(
+                success=True,
+                used_agent=observe_calls > 0,
+                raw=status_text,
+                cache=cache,
+                used_llm=observe_calls > 0
+            )
+
+        # 2️⃣ Status is still "Running" → wait for a DOM change (push)
+        logger.info(f"⏳ Still waiting... Current status: {status_text}")
+        wait_s = min(interval_s, timeout_s - (time.time() - start))
+        if wait_s <= 0:
+            break
+        try:
+            changed = await asyncio.wait_for(
+                page.evaluate(_STATUS_CHANGED_JS, [selector, forbidden_value, wait_s * 1000]),
+                wait_s + 5,
+            )
+            if not changed:
+                logger.debug("No status change pushed within the poll interval; re-checking")
+        except Exception as e:
+            # Navigation destroyed the observer; re-read on next loop
+            logger.debug(f"Status observer interrupted: {e}")
+            await asyncio.sleep(0.5)
+
+    deadline = current_deadline()
+    if deadline and deadline.remaining() <= 0:
+        raise DeadlineExceeded(deadline.label, f"{step} (last status: {last_status})")
+    raise TimeoutError(
+        f"Timeout waiting for backup job. Last status: {last_status}"
+    )
+
+
+async def _read_text(page, selector: str):
+    try:
+        elem = await page.query_selector(selector)
+        if not elem:
+            return None
+        text = await elem.inner_text()
+        return text.strip() if text and text.strip() else None
+    except Exception as e:
+        logger.debug(f"Reading status selector '{selector}' failed: {e}")
+        return None
+
+
+async def _observe_status(page, step: str, engine, fingerprint=None):
+    """One LLM observe for the status element; caches its selector."""
+    try:
+        result = await page.observe(step)
+    except Exception as e:
+        logger.debug(f"observe failed: {e}; retrying...")
+        return None, None
+
+    if result is None or (isinstance(result, list) and len(result) == 0):
+        return None, None
+
+    status_text = await extract_status_text(page, result)
+    item = result[0] if isinstance(result, list) else result
+    selector = getattr(item, "selector", None)
+    if selector:
+        engine.store.put(SelectorSnapshot(
+            step=step,
+            selector=selector,
+            method="observe",
+            arguments=[],
+            description=getattr(item, "description", "") or "Wait status element",
+            fingerprint=asdict(fingerprint) if fingerprint else None,
+        ))
+    return selector, status_text
+
+
+async def extract_status_text(page, result):
+    """Robustly extract visible status text from observe results.
+    - Supports list/dict/single result
+    - Tries direct text fields first, then uses selector to read inner text
+    """
+    if result is None:
+        return None
+
+    # Normalize to a list of items to inspect
+    items = []
+    if isinstance(result, dict) and 'elements' in result:
+        items = result.get('elements') or []
+    elif isinstance(result, list):
+        items = result
+    else:
+        items = [result]
+
+    # First pass: use any direct text fields provided by Stagehand
+    for item in items:
+        text = getattr(item, 'text', None) or getattr(item, 'statusText', None)
+        if isinstance(text, str) and text.strip():
+            return text.strip()
+
+    # Second pass: if a selector is available, read the element text now (avoids stale node ids)
+    for item in items:
+        selector = getattr(item, 'selector', None)
+        if not selector:
+            continue
+        try:
+            elem = await page.query_selector(selector)
+            if elem:
+                text = await elem.inner_text()
+                if text and text.strip():
+                    return text.strip()
+        except Exception as e:
+            logger.debug(f"extract_status_text: failed to read selector '{selector}': {e}")
+            continue
+    return None